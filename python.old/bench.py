@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+# Benchmarks full-month generation on synthetic ABA databases.
+#   python3 bench.py --members 50 500 5000 --density 0.2 0.5
+#   python3 bench.py --startup   # `main.py --help` and `main.py reset` must stay near-instant
+from contextlib import redirect_stdout
+import argparse
+import io
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from exporters import export
+import main
+
+# Same table as in README.md
+ABA_DDL = '''
+CREATE TABLE ABA (
+    No   INTEGER     PRIMARY KEY
+                     UNIQUE
+                     NOT NULL,
+    NAME TEXT        NOT NULL,
+    B    INTEGER     NOT NULL
+                     DEFAULT (100),
+    R    INTEGER     NOT NULL
+                     DEFAULT (100),
+    I    INTEGER     NOT NULL
+                     DEFAULT (100),
+''' + ',\n'.join(f'''    {col}   INTEGER (1) DEFAULT 0
+                     NOT NULL''' for col in main.SLOTS) + '''
+);
+'''
+
+def build_db(path, members, density, seed=0):
+    # Each column gets its own availability rate around density (x0.5 .. x1.5), so
+    # some masses are scarce and some are crowded, like a real parish.
+    rng = random.Random(seed)
+    rates = {col: min(1.0, density * rng.uniform(0.5, 1.5)) for col in main.SLOTS}
+    rows = []
+    for n in range(members):
+        avail = [1 if rng.random() < rates[col] else 0 for col in main.SLOTS]
+        rows.append([1000 + n, f'Member {n}', rng.choice((95, 100, 105)), rng.choice((95, 100, 105)), rng.choice((95, 100, 105))] + avail)
+    # A mass needs three different members every week
+    for k, col in enumerate(main.SLOTS):
+        for row in rows[:3]:
+            row[5 + k] = 1
+    con = sqlite3.connect(path)
+    con.executescript(ABA_DDL)
+    with con:
+        con.executemany(f'INSERT INTO ABA VALUES ({", ".join("?" * (5 + len(main.SLOTS)))})', rows)
+    con.close()
+
+def run_case(members, density, year, month, engine='python', seed=0, memory=True):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ABA.db')
+        build_db(path, members, density, seed)
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            con = main.open_db(path)
+            timer = main.PhaseTimer()
+            timer.watch(con)
+            if memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                schedules = main.generate_range([(year, month)], con, rng=random.Random(seed), engine=engine, timer=timer)
+                names = main.load_names(con.cursor())
+                for y, m, schedule in schedules:
+                    with timer.phase('analyze_frequencies'):
+                        main.analyze_frequencies(schedule, names)
+                    with timer.phase('export'):
+                        export(schedule, names, y, m, ['csv'])
+            total = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if memory else None
+            if memory:
+                tracemalloc.stop()
+            con.close()
+        finally:
+            os.chdir(cwd)
+    return {
+        'members': members,
+        'density': density,
+        'engine': engine,
+        'total': round(total, 6),
+        'queries': timer.statements,
+        'peak_kib': peak // 1024 if peak is not None else None,
+        'phases': timer.summary(),
+    }
+
+def startup_times(runs=5):
+    # Best wall time of fresh `python3 main.py ...` processes, next to a bare interpreter
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+    commands = {'python': ['-c', 'pass'], 'help': [script, '--help'], 'reset': [script, 'reset']}
+    times = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        build_db(os.path.join(tmp, 'ABA.db'), 50, 0.3)
+        for name, args in commands.items():
+            best = None
+            for _ in range(runs):
+                start = time.perf_counter()
+                subprocess.run([sys.executable] + args, cwd=tmp, stdout=subprocess.DEVNULL, check=True)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            times[name] = round(best, 4)
+    return times
+
+def print_table(results):
+    phases = []
+    for res in results:
+        phases += [p for p in res['phases'] if p not in phases]
+    header = ['members', 'density', 'engine', 'total', 'queries', 'peak_kib'] + phases
+    rows = [[res['members'], res['density'], res['engine'], f"{res['total']:.3f}", res['queries'], res['peak_kib']]
+            + [f"{res['phases'][p]['wall']:.3f}" if p in res['phases'] else '-' for p in phases] for res in results]
+    widths = [max(len(str(x)) for x in col) for col in zip(header, *rows)]
+    for row in [header] + rows:
+        print('  '.join(str(x).rjust(w) for x, w in zip(row, widths)))
+
+def main_bench(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark schedule generation on synthetic ABA databases.")
+    parser.add_argument('--members', type=int, nargs='+', default=[50, 500, 5000], help="Member counts to test")
+    parser.add_argument('--density', type=float, nargs='+', default=[0.3], help="Average availability per mass (0-1)")
+    parser.add_argument('--month', type=int, default=5, help="Month in MM")
+    parser.add_argument('--year', type=int, default=2025, help="Year in YYYY")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'flow'], default='python', help="Selection engine")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic DB and the run")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc (it slows the run down)")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON (with CPU time and SQL per phase)")
+    parser.add_argument('--startup', action='store_true', help="Only time `main.py --help` and `main.py reset` startup")
+    parser.add_argument('--startup-limit', type=float, default=0.15, metavar='SECONDS',
+                        help="With --startup: fail if either takes this much longer than a bare interpreter")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        times = startup_times()
+        print(json.dumps(times, indent=2) if args.json else '  '.join(f'{name} {t:.3f}s' for name, t in times.items()))
+        slow = [name for name in ('help', 'reset') if times[name] - times['python'] > args.startup_limit]
+        if slow:
+            parser.exit(1, f"Startup too slow: {', '.join(slow)} (limit {args.startup_limit}s over python)\n")
+        return
+
+    results = []
+    for members in args.members:
+        for density in args.density:
+            results.append(run_case(members, density, args.year, args.month, args.engine, args.seed, not args.no_memory))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_table(results)
+
+if __name__ == '__main__':
+    main_bench()
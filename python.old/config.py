@@ -0,0 +1,73 @@
+import os
+
+WEEK_NAMES = ['m', 't', 'w', 'h', 'f', 's', 'u']
+CONFIG_FILE = 'listgen.toml'
+
+class Config:
+    # Masses per day, roles per mass and what the weights do. Availability columns in
+    # ABA are <weekday letter><mass number> (m1 ... u3 for three masses), every role
+    # has a weight column of its own named by its key (B, R, I).
+    def __init__(self, mass_times, roles, default_weight=100, monthly_bump=20):
+        # roles: [{'key', 'name', 'label', 'title', 'charge': {column: delta}}, ...]
+        if not mass_times:
+            raise ValueError('Config needs at least one mass time')
+        if not roles:
+            raise ValueError('Config needs at least one role')
+        self.mass_times = list(mass_times)
+        self.masses = len(self.mass_times)
+        self.slots = [f'{l}{n}' for l in WEEK_NAMES for n in range(1, self.masses + 1)]
+        self.slot_index = {slot: k for k, slot in enumerate(self.slots)}
+        self.roles = tuple(role['key'] for role in roles)
+        for key in self.roles:
+            # Keys end up as column names in SQL
+            if not key.isidentifier() or key in self.slot_index or key.upper() in ('NO', 'NAME'):
+                raise ValueError(f"Role key '{key}' cannot be used as an ABA column")
+        if len(set(self.roles)) != len(self.roles):
+            raise ValueError(f'Role keys must be unique, got {", ".join(self.roles)}')
+        self.names = {role['key']: role.get('name', role['key']) for role in roles}
+        self.labels = {role['key']: role.get('label', self.names[role['key']].upper()) for role in roles}
+        self.titles = {role['key']: role.get('title', f'DAILY {self.labels[role["key"]]} LIST') for role in roles}
+        self.deltas = {}
+        for role in roles:
+            charge = role.get('charge', {role['key']: -10})
+            unknown = [col for col in charge if col not in self.roles]
+            if unknown:
+                raise ValueError(f"Role '{role['key']}' charges unknown weight columns: {', '.join(unknown)}")
+            self.deltas[role['key']] = tuple((col, int(delta)) for col, delta in charge.items())
+        self.default_weight = default_weight
+        self.monthly_bump = monthly_bump
+
+DEFAULT = Config(
+    mass_times=['6:00 am', '7:30 am', '5:00 pm'],
+    roles=[
+        {'key': 'B', 'name': 'Bible Reading', 'label': 'BIBLE READING', 'title': 'DAILY BIBLE READING LIST', 'charge': {'B': -10, 'R': -5}},
+        {'key': 'R', 'name': 'Reading', 'label': 'READING', 'title': 'DAILY READING LIST', 'charge': {'R': -10, 'B': -5}},
+        {'key': 'I', 'name': 'Incense', 'label': 'INCENSE', 'title': 'DAILY INCENSE LIST', 'charge': {'I': -10}},
+    ],
+)
+
+def load_config(path=None):
+    # path, else listgen.toml in the working directory, else DEFAULT
+    if path is None:
+        if not os.path.exists(CONFIG_FILE):
+            return DEFAULT
+        path = CONFIG_FILE
+    # Only needed when there is a file to read, and only there since Python 3.11
+    import tomllib
+    try:
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f'{path}: {e}')
+    weights = data.get('weights', {})
+    try:
+        return Config(
+            data.get('masses', {}).get('times', DEFAULT.mass_times),
+            data['roles'] if 'roles' in data else [
+                {'key': key, 'name': DEFAULT.names[key], 'label': DEFAULT.labels[key], 'title': DEFAULT.titles[key],
+                 'charge': dict(DEFAULT.deltas[key])} for key in DEFAULT.roles],
+            weights.get('default', DEFAULT.default_weight),
+            weights.get('monthly_bump', DEFAULT.monthly_bump),
+        )
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f'{path}: invalid config ({e!r})')
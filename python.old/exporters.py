@@ -0,0 +1,158 @@
+from contextlib import ExitStack
+import calendar
+import csv
+import json
+
+from config import DEFAULT
+from schedule import Schedule
+
+SCHEDULE_DDL = '''
+CREATE TABLE IF NOT EXISTS SCHEDULE (
+    YEAR  INTEGER NOT NULL,
+    MONTH INTEGER NOT NULL,
+    DAY   INTEGER NOT NULL,
+    MASS  INTEGER NOT NULL,
+    ROLE  TEXT    NOT NULL,
+    No    INTEGER NOT NULL,
+    NAME  TEXT    NOT NULL,
+    PRIMARY KEY (YEAR, MONTH, DAY, MASS, ROLE)
+)
+'''
+
+# Every sink takes (year, month, con, config) and gets write(day, slots, names) once
+# per day of the month, in order, followed by close(failed). export() uses them as
+# context managers, so a sink is closed (failed=True) even when another one raised.
+
+class Sink:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(failed=exc_type is not None)
+
+class CsvSink(Sink):
+    # The three classic lists, one file per role
+    def __init__(self, year, month, con=None, config=DEFAULT):
+        month_name = str.upper(calendar.month_name[month])
+        titles = [config.titles[role] for role in config.roles]
+        self.paths = [f'{title} {month_name} {year}.csv' for title in titles]
+        self.files = []
+        try:
+            for path in self.paths:
+                self.files.append(open(path, 'w', newline=''))
+        except OSError:
+            self.close(failed=True)
+            raise
+        self.writers = [csv.writer(f) for f in self.files]
+        for title, writer in zip(titles, self.writers):
+            writer.writerow([f'{title} {month_name} {year}'] + [''] * config.masses)
+            writer.writerow(['DATE'] + config.mass_times)
+
+    def write(self, day, slots, names):
+        for k, writer in enumerate(self.writers):
+            writer.writerow([day] + [names[slot[k]] for slot in slots])
+
+    def close(self, failed=False):
+        for f in self.files:
+            f.close()
+
+class CombinedCsvSink(Sink):
+    # One file, one row per date with a column per mass and role
+    def __init__(self, year, month, con=None, config=DEFAULT):
+        month_name = str.upper(calendar.month_name[month])
+        self.paths = [f'DAILY LISTS {month_name} {year}.csv']
+        self.file = open(self.paths[0], 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['DATE'] + [f'{t} {config.labels[role]}' for t in config.mass_times for role in config.roles])
+
+    def write(self, day, slots, names):
+        self.writer.writerow([day] + [names[mem_id] for slot in slots for mem_id in slot])
+
+    def close(self, failed=False):
+        self.file.close()
+
+class JsonlSink(Sink):
+    # One JSON object per assignment
+    def __init__(self, year, month, con=None, config=DEFAULT):
+        month_name = str.upper(calendar.month_name[month])
+        self.year, self.month = year, month
+        self.config = config
+        self.paths = [f'SCHEDULE {month_name} {year}.jsonl']
+        self.file = open(self.paths[0], 'w')
+
+    def write(self, day, slots, names):
+        for mass, slot in enumerate(slots, 1):
+            for role, mem_id in zip(self.config.roles, slot):
+                self.file.write(json.dumps({
+                    'year': self.year, 'month': self.month, 'day': day, 'mass': mass,
+                    'time': self.config.mass_times[mass - 1], 'role': role, 'no': mem_id, 'name': names[mem_id],
+                }) + '\n')
+
+    def close(self, failed=False):
+        self.file.close()
+
+class SqliteSink(Sink):
+    # SCHEDULE table in ABA.db, the month is replaced in one transaction on close(),
+    # nothing is written when the export failed
+    def __init__(self, year, month, con, config=DEFAULT):
+        self.con = con
+        self.year, self.month = year, month
+        self.roles = config.roles
+        self.paths = []
+        self.rows = []
+
+    def write(self, day, slots, names):
+        for mass, slot in enumerate(slots, 1):
+            for role, mem_id in zip(self.roles, slot):
+                self.rows.append((self.year, self.month, day, mass, role, mem_id, names[mem_id]))
+
+    def close(self, failed=False):
+        if failed:
+            return
+        with self.con:
+            self.con.execute(SCHEDULE_DDL)
+            self.con.execute('DELETE FROM SCHEDULE WHERE YEAR = ? AND MONTH = ?', (self.year, self.month))
+            self.con.executemany('INSERT INTO SCHEDULE VALUES (?, ?, ?, ?, ?, ?, ?)', self.rows)
+
+SINKS = {'csv': CsvSink, 'combined': CombinedCsvSink, 'jsonl': JsonlSink, 'sqlite': SqliteSink}
+
+def export(schedule, names, year, month, formats=('csv',), con=None, config=DEFAULT):
+    # Single pass over the schedule, each day is handed to every sink.
+    # Returns the files written.
+    # Every sink that was created is closed, also when a later one or a write raises;
+    # SCHEDULE is only replaced when every day was written, never with half a month.
+    with ExitStack() as stack:
+        sinks = [stack.enter_context(SINKS[fmt](year, month, con, config)) for fmt in formats]
+        for day, slots in schedule.items():
+            for sink in sinks:
+                sink.write(day, slots, names)
+    return [path for sink in sinks for path in sink.paths]
+
+def read_sqlite_schedule(con, year, month, config=DEFAULT):
+    # Schedule of member Nos from SCHEDULE, None if the month is not there
+    if not con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'SCHEDULE'").fetchone():
+        return None
+    rows = con.execute('SELECT DAY, MASS, ROLE, No FROM SCHEDULE WHERE YEAR = ? AND MONTH = ?', (year, month)).fetchall()
+    if not rows:
+        return None
+    schedule = Schedule({day for day, mass, role, mem_id in rows}, config.masses, len(config.roles))
+    for day, mass, role, mem_id in rows:
+        schedule.set_cell(day, mass - 1, config.roles.index(role), mem_id)
+    return schedule
+
+def read_csv_schedule(year, month, names, config=DEFAULT):
+    # Same from the three classic lists, names are mapped back to member Nos
+    month_name = str.upper(calendar.month_name[month])
+    by_name = {}
+    for mem_id, name in names.items():
+        by_name.setdefault(name, []).append(mem_id)
+    schedule = Schedule(range(1, calendar.monthrange(year, month)[1] + 1), config.masses, len(config.roles))
+    for k, role in enumerate(config.roles):
+        title = config.titles[role]
+        with open(f'{title} {month_name} {year}.csv', newline='') as f:
+            for row in list(csv.reader(f))[2:]:
+                for mass, name in enumerate(row[1:]):
+                    if len(by_name.get(name, ())) != 1:
+                        raise ValueError(f"'{name}' in {title} on day {row[0]} does not match exactly one member")
+                    schedule.set_cell(int(row[0]), mass, k, by_name[name][0])
+    return schedule
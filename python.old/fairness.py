@@ -0,0 +1,117 @@
+from array import array
+import calendar
+import csv
+import heapq
+import json
+import math
+
+from config import DEFAULT
+
+REPORTS = ('json', 'csv')
+
+# Fairness of one month: how often every member got each role, how even that is
+# and how often people serve on two days in a row.
+
+def spread(values):
+    # min/max/mean/stddev (population) and Gini of a list of counts
+    n = len(values)
+    if not n:
+        return {'min': 0, 'max': 0, 'mean': 0, 'stddev': 0, 'gini': 0}
+    total = sum(values)
+    mean = total / n
+    ordered = sorted(values)
+    gini = (2 * sum(k * x for k, x in enumerate(ordered, 1)) / (n * total) - (n + 1) / n) if total else 0
+    return {
+        'min': ordered[0],
+        'max': ordered[-1],
+        'mean': round(mean, 4),
+        'stddev': round(math.sqrt(sum((x - mean) ** 2 for x in values) / n), 4),
+        'gini': round(gini, 4),
+    }
+
+def fairness_report(schedule, names, k=10, config=DEFAULT):
+    # Counts live in one int array per role indexed by member position, filled in a
+    # single pass over the member Nos. Top/bottom k use heap selection instead of a
+    # full sort; ties keep the order of Counter.most_common() like the old report.
+    pos = {mem_id: p for p, mem_id in enumerate(names)}
+    ids = list(names)
+    for slots in schedule.values():
+        for slot in slots:
+            for mem_id in slot:
+                if mem_id not in pos:
+                    pos[mem_id] = len(ids)
+                    ids.append(mem_id)
+    roles = config.roles
+    counts = [array('i', bytes(4 * len(ids))) for role in roles]
+    repeats = array('i', bytes(4 * len(ids)))
+    first_seen = [{} for role in roles]
+    same_slot = 0
+    for day, slots in schedule.items():
+        for slot in slots:
+            for c, mem_id in enumerate(slot):
+                counts[c][pos[mem_id]] += 1
+                first_seen[c].setdefault(mem_id, None)
+        next_slots = schedule.get(day + 1)
+        if next_slots:
+            for mem_id in {m for s in slots for m in s} & {m for s in next_slots for m in s}:
+                repeats[pos[mem_id]] += 1
+            same_slot += sum(a == b for s1, s2 in zip(slots, next_slots) for a, b in zip(s1, s2))
+
+    members = len(names)
+    report = {'members': members, 'days': len(schedule), 'roles': {}}
+    for role, col, seen in zip(roles, counts, first_seen):
+        count = lambda mem_id: col[pos[mem_id]]
+        report['roles'][role] = spread(col[:members].tolist())
+        report['roles'][role]['top'] = [[m, count(m)] for m in heapq.nlargest(k, seen, key=count)]
+        report['roles'][role]['bottom'] = [[m, count(m)] for m in heapq.nsmallest(k, reversed(seen), key=count)]
+        report['roles'][role]['missing'] = [m for m in names if not col[pos[m]]]
+    totals = [sum(col[p] for col in counts) for p in range(len(ids))]
+    report['total'] = spread(totals[:members])
+    report['repeats'] = {
+        'consecutive_days': sum(repeats),
+        'same_slot': same_slot,
+        'top': [[ids[p], repeats[p]] for p in heapq.nlargest(k, range(len(ids)), key=repeats.__getitem__) if repeats[p]],
+    }
+    report['counts'] = {mem_id: {role: col[p] for role, col in zip(roles, counts)} | {'total': totals[p], 'repeats': repeats[p]}
+                        for mem_id, p in pos.items()}
+    return report
+
+def print_report(report, names, config=DEFAULT, k=10):
+    # k: the k fairness_report() was called with
+    for role in report['roles']:
+        title = config.names.get(role, role)
+        stats = report['roles'][role]
+        print(f"\nTop {k} Most {title} ({role}):")
+        for mem_id, count in stats['top']:
+            print(f"     {names.get(mem_id, mem_id)} ({count})")
+        print(f"\nTop {k} Least {title} ({role}):")
+        for mem_id, count in stats['bottom']:
+            print(f"     {names.get(mem_id, mem_id)} ({count})")
+        print(f"\nNames Not Assigned in {title} ({role}):")
+        if stats['missing']:
+            for mem_id in stats['missing']:
+                print(f"     {names[mem_id]}")
+        else:
+            print("     None")
+    print("\nFairness:")
+    for role, stats in list(report['roles'].items()) + [('Total', report['total'])]:
+        print(f"     {role}: min {stats['min']}, max {stats['max']}, mean {stats['mean']}, stddev {stats['stddev']}, gini {stats['gini']}")
+    print(f"     Consecutive days: {report['repeats']['consecutive_days']} (same mass and role: {report['repeats']['same_slot']})")
+
+def write_report(report, names, year, month, formats=('json',)):
+    # FAIRNESS <MONTH> <YEAR>.json (everything) and/or .csv (one row per member).
+    # Returns the files written.
+    month_name = str.upper(calendar.month_name[month])
+    paths = []
+    if 'json' in formats:
+        paths.append(f'FAIRNESS {month_name} {year}.json')
+        with open(paths[-1], 'w') as f:
+            json.dump({'year': year, 'month': month} | report, f, indent=2)
+    if 'csv' in formats:
+        paths.append(f'FAIRNESS {month_name} {year}.csv')
+        with open(paths[-1], 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['No', 'NAME'] + list(report['roles']) + ['TOTAL', 'REPEATS'])
+            for mem_id, row in report['counts'].items():
+                writer.writerow([mem_id, names.get(mem_id, '')] + [row[role] for role in report['roles']] + [row['total'], row['repeats']])
+    return paths
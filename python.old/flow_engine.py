@@ -0,0 +1,245 @@
+from collections import deque
+import heapq
+
+from config import DEFAULT
+from schedule import Schedule
+
+# Alternative to random_selector + fix_schedule, picked with --engine flow.
+#
+# 1. Loads: one min-cost flow over the whole month decides how often every member
+#    serves at every mass column (m1 ... u3):
+#        source -> member -> (member, weekday) -> column -> sink
+#    The k-th assignment of a member costs STEP * k - (average role weight), the same
+#    "-10 per pick" rule as the greedy selector but solved globally, so loads are as
+#    even as availability allows and higher weights are served first.
+#    (member, weekday) is capped at the number of such weekdays in the month, so
+#    nobody needs to serve twice on one day.
+# 2. Dates: for every date in calendar order a small min-cost flow assigns the
+#    (mass, role) cells (nine by default) from those loads: one cell per member per
+#    day, role costs from the current role weights, no same role as on the previous day.
+#    Members whose remaining load equals the remaining dates of that weekday must
+#    be placed. A bipartite graph always has a matching that covers its max-degree
+#    vertices, so the loads from step 1 always fit.
+
+STEP = 10
+ADJACENT = 10 ** 6  # same role as on the previous day
+TIGHT = 10 ** 9     # a member that has to serve today
+
+class MinCostFlow:
+    # Primal-dual min-cost flow: Dijkstra with potentials for the shortest distance,
+    # then Dinic-style augmentation over every arc with zero reduced cost.
+    def __init__(self):
+        self.graph = []
+
+    def add_node(self):
+        self.graph.append([])
+        return len(self.graph) - 1
+
+    def add_edge(self, u, v, cap, cost):
+        # [to, residual capacity, cost, index of reverse edge]
+        edge = [v, cap, cost, len(self.graph[v])]
+        self.graph[u].append(edge)
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return edge
+
+    def flow_on(self, edge):
+        return self.graph[edge[0]][edge[3]][1]
+
+    def initial_potentials(self, s):
+        # Bellman-Ford (queue based), only needed when there are negative costs
+        n = len(self.graph)
+        h = [0] * n
+        if all(e[2] >= 0 for edges in self.graph for e in edges if e[1] > 0):
+            return h
+        inf = float('inf')
+        dist = [inf] * n
+        dist[s] = 0
+        queue, queued = deque([s]), [False] * n
+        while queue:
+            u = queue.popleft()
+            queued[u] = False
+            for v, cap, cost, rev in self.graph[u]:
+                if cap > 0 and dist[u] + cost < dist[v]:
+                    dist[v] = dist[u] + cost
+                    if not queued[v]:
+                        queued[v] = True
+                        queue.append(v)
+        return [d if d < inf else 0 for d in dist]
+
+    def flow(self, s, t, maxf):
+        n = len(self.graph)
+        h = self.initial_potentials(s)
+        inf = float('inf')
+        total = 0
+        while total < maxf:
+            dist = [inf] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                hu = h[u]
+                for v, cap, cost, rev in self.graph[u]:
+                    if cap > 0:
+                        nd = d + cost + hu - h[v]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            heapq.heappush(heap, (nd, v))
+            if dist[t] == inf:
+                break
+            limit = dist[t]
+            for v in range(n):
+                h[v] += min(dist[v], limit)
+            total += self.augment(s, t, h, maxf - total)
+        return total
+
+    def augment(self, s, t, h, maxf):
+        # Dinic on the admissible arcs (residual, zero reduced cost)
+        total = 0
+        graph = self.graph
+        while total < maxf:
+            level = [-1] * len(graph)
+            level[s] = 0
+            queue = deque([s])
+            while queue:
+                u = queue.popleft()
+                for v, cap, cost, rev in graph[u]:
+                    if cap > 0 and level[v] < 0 and cost + h[u] - h[v] == 0:
+                        level[v] = level[u] + 1
+                        queue.append(v)
+            if level[t] < 0:
+                break
+            it = [0] * len(graph)
+            while total < maxf:
+                # Iterative DFS along increasing levels, current-arc pointers in it
+                path, u = [], s
+                while u != t:
+                    edges = graph[u]
+                    while it[u] < len(edges):
+                        v, cap, cost, rev = edges[it[u]]
+                        if cap > 0 and level[v] == level[u] + 1 and cost + h[u] - h[v] == 0:
+                            break
+                        it[u] += 1
+                    if it[u] == len(edges):
+                        if not path:
+                            break
+                        level[u] = -1
+                        u = path.pop()[0]
+                        it[u] += 1
+                        continue
+                    path.append((u, edges[it[u]]))
+                    u = edges[it[u]][0]
+                if u != t:
+                    break
+                f = min(min(e[1] for _, e in path), maxf - total)
+                for _, e in path:
+                    e[1] -= f
+                    graph[e[0]][e[3]][1] += f
+                total += f
+        return total
+
+def priority(weights, mem_id):
+    return sum(weights[role][mem_id] for role in weights) // len(weights)
+
+def plan_loads(availability, days, weights):
+    # Step 1. Returns {(member No, column): times} for the month
+    per_weekday = {}
+    for letter in days.values():
+        per_weekday[letter] = per_weekday.get(letter, 0) + 1
+    roles = len(weights)
+    columns = [col for col in availability.slot_members if col[0] in per_weekday]
+    demand = sum(roles * per_weekday[col[0]] for col in columns)
+    first = next(iter(weights.values()))
+
+    def eligible(mem_id):
+        return mem_id in first and any(weights[role][mem_id] > 0 for role in weights)
+
+    # Only the `demand` cheapest members of a column can be needed there: if a more
+    # expensive one were used, one of them would be idle and at least as cheap.
+    kept = {}
+    for col in columns:
+        members = sorted((m for m in availability.slot_members[col] if eligible(m)), key=lambda m: -priority(weights, m))
+        kept[col] = members[:demand]
+
+    offset = max([priority(weights, m) for ms in kept.values() for m in ms] + [0])
+    mcf = MinCostFlow()
+    source, sink = mcf.add_node(), mcf.add_node()
+    member_node, weekday_node, col_node, arcs = {}, {}, {}, {}
+    for col in columns:
+        col_node[col] = mcf.add_node()
+        mcf.add_edge(col_node[col], sink, roles * per_weekday[col[0]], 0)
+        for m in kept[col]:
+            if m not in member_node:
+                member_node[m] = mcf.add_node()
+            if (m, col[0]) not in weekday_node:
+                weekday_node[m, col[0]] = mcf.add_node()
+                mcf.add_edge(member_node[m], weekday_node[m, col[0]], per_weekday[col[0]], 0)
+            arcs[m, col] = mcf.add_edge(weekday_node[m, col[0]], col_node[col], per_weekday[col[0]], 0)
+    # A member can serve at most once on each day of the weekdays they are kept for
+    most = dict.fromkeys(member_node, 0)
+    for m, letter in weekday_node:
+        most[m] += per_weekday[letter]
+    for m, node in member_node.items():
+        for k in range(most[m]):
+            mcf.add_edge(source, node, 1, STEP * k + offset - priority(weights, m))
+
+    if mcf.flow(source, sink, demand) < demand:
+        short = [col for col in columns if len(kept[col]) < roles]
+        raise ValueError(f'Not enough members available to fill every mass{" (" + ", ".join(short) + ")" if short else ""}')
+    return {key: mcf.flow_on(edge) for key, edge in arcs.items() if mcf.flow_on(edge)}
+
+def assign_day(day, letter, quota, remaining, weights, previous, masses=3):
+    # Step 2 for one date. Returns [(b, r, i), ...] for masses 1 ... masses
+    columns = [f'{letter}{n}' for n in range(1, masses + 1)]
+    members = {}
+    for (m, col), left in quota.items():
+        if col in columns and left > 0:
+            members.setdefault(m, []).append(col)
+    offset = max([weights[role][m] for m in members for role in weights] + [0])
+
+    mcf = MinCostFlow()
+    source, sink = mcf.add_node(), mcf.add_node()
+    cells = {}
+    for col in columns:
+        for role in weights:
+            cells[col, role] = mcf.add_node()
+            mcf.add_edge(cells[col, role], sink, 1, 0)
+    arcs = []
+    for m, cols in members.items():
+        node = mcf.add_node()
+        tight = sum(quota[m, col] for col in cols) == remaining[letter]
+        mcf.add_edge(source, node, 1, -TIGHT if tight else 0)
+        for col in cols:
+            for role in weights:
+                if weights[role][m] > 0:
+                    cost = offset - weights[role][m] + (ADJACENT if previous.get(m) == role else 0)
+                    arcs.append((m, col, role, mcf.add_edge(node, cells[col, role], 1, cost)))
+
+    if mcf.flow(source, sink, len(cells)) < len(cells):
+        raise ValueError(f'Could not fill every role on day {day}, check for role weights of 0')
+    picked = {(col, role): m for m, col, role, edge in arcs if mcf.flow_on(edge)}
+    for (col, role), m in picked.items():
+        quota[m, col] -= 1
+    remaining[letter] -= 1
+    return [tuple(picked[col, role] for role in weights) for col in columns]
+
+def solve_month(availability, days, weights, config=DEFAULT):
+    # Schedule of member Nos, weights are updated like random_selector does.
+    # weights must hold config.roles in that order (main.load_weights does).
+    quota = plan_loads(availability, days, weights)
+    remaining = {}
+    for letter in days.values():
+        remaining[letter] = remaining.get(letter, 0) + 1
+    schedule = Schedule(days, config.masses, len(config.roles))
+    previous = {}
+    for day, letter in days.items():
+        slots = assign_day(day, letter, quota, remaining, weights, previous, config.masses)
+        previous = {}
+        for mass, slot in enumerate(slots):
+            schedule.set_slot(day, mass, slot)
+            for role, mem_id in zip(config.roles, slot):
+                previous[mem_id] = role
+                for col, delta in config.deltas[role]:
+                    weights[col][mem_id] += delta
+    return schedule
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# Assignment history in ABA.db and queries on it.
+#   python3 history.py member 1012 --days 90
+#   python3 history.py window --days 90 --end 2025-05-31
+#   python3 history.py weights --days 90 --apply
+from datetime import date, timedelta
+import argparse
+import calendar
+import sqlite3
+
+from config import DEFAULT, WEEK_NAMES, load_config
+from schedule import Schedule
+
+ROLES = DEFAULT.roles
+
+# Append-only: every saved run adds the cells of its months under a new RUN number,
+# nothing is updated or deleted (--reset only touches ABA). When a month is generated
+# again, CURRENT_ASSIGNMENTS only shows the latest run for each date.
+# One statement each, so they can run with con.execute() inside the run's transaction
+# (executescript would commit first).
+ASSIGNMENTS_DDL = (
+    '''CREATE TABLE IF NOT EXISTS ASSIGNMENTS (
+    RUN  INTEGER NOT NULL,
+    DATE TEXT    NOT NULL,
+    SLOT TEXT    NOT NULL,
+    ROLE TEXT    NOT NULL,
+    No   INTEGER NOT NULL
+)''',
+    'CREATE INDEX IF NOT EXISTS ASSIGNMENTS_No ON ASSIGNMENTS (No, DATE)',
+    'CREATE INDEX IF NOT EXISTS ASSIGNMENTS_DATE ON ASSIGNMENTS (DATE, RUN)',
+    '''CREATE VIEW IF NOT EXISTS CURRENT_ASSIGNMENTS AS
+    SELECT * FROM ASSIGNMENTS a WHERE RUN = (SELECT MAX(RUN) FROM ASSIGNMENTS WHERE DATE = a.DATE)''',
+)
+
+def has_history(con):
+    return con.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ASSIGNMENTS'").fetchone() is not None
+
+def record_assignments(con, schedules, roles=ROLES):
+    # Appends [(year, month, schedule), ...], returns the RUN number. Runs in the
+    # caller's transaction (main.finish_run saves the weights in the same one)
+    for statement in ASSIGNMENTS_DDL:
+        con.execute(statement)
+    run = con.execute('SELECT COALESCE(MAX(RUN), 0) + 1 FROM ASSIGNMENTS').fetchone()[0]
+    rows = []
+    for year, month, schedule in schedules:
+        for day, slots in schedule.items():
+            when = date(year, month, day)
+            letter = WEEK_NAMES[when.weekday()]
+            for mass, slot in enumerate(slots, 1):
+                for role, mem_id in zip(roles, slot):
+                    rows.append((run, when.isoformat(), f'{letter}{mass}', role, mem_id))
+    con.executemany('INSERT INTO ASSIGNMENTS VALUES (?, ?, ?, ?, ?)', rows)
+    return run
+
+def window(end=None, days=90):
+    # (first, last) ISO dates of the `days` days up to and including end (default today)
+    end = date.fromisoformat(end) if isinstance(end, str) else end or date.today()
+    return (end - timedelta(days=days - 1)).isoformat(), end.isoformat()
+
+def member_history(con, mem_id, first=None, last=None):
+    # [(date, slot, role), ...] of one member, oldest first
+    return con.execute('''
+        SELECT DATE, SLOT, ROLE FROM CURRENT_ASSIGNMENTS
+        WHERE No = ? AND DATE >= ? AND DATE <= ? ORDER BY DATE, SLOT
+    ''', (mem_id, first or '0000-00-00', last or '9999-99-99')).fetchall()
+
+def month_schedule(con, year, month, roles=ROLES):
+    # Schedule of member Nos of the latest run, None if the month is not there
+    if not has_history(con):
+        return None
+    first, last = date(year, month, 1).isoformat(), date(year, month, calendar.monthrange(year, month)[1]).isoformat()
+    rows = con.execute('SELECT DATE, SLOT, ROLE, No FROM CURRENT_ASSIGNMENTS WHERE DATE >= ? AND DATE <= ?', (first, last)).fetchall()
+    if not rows:
+        return None
+    schedule = Schedule({int(when[8:]) for when, slot, role, mem_id in rows}, max(int(slot[1:]) for when, slot, role, mem_id in rows), len(roles))
+    for when, slot, role, mem_id in rows:
+        schedule.set_cell(int(when[8:]), int(slot[1:]) - 1, roles.index(role), mem_id)
+    return schedule
+
+def window_counts(con, first, last, roles=ROLES):
+    # {No: {'B': n, 'R': n, 'I': n}} for the dates first..last
+    counts = {}
+    rows = con.execute('''
+        SELECT No, ROLE, COUNT(*) FROM CURRENT_ASSIGNMENTS
+        WHERE DATE >= ? AND DATE <= ? GROUP BY No, ROLE
+    ''', (first, last))
+    for mem_id, role, n in rows:
+        if role in roles:
+            counts.setdefault(mem_id, dict.fromkeys(roles, 0))[role] = n
+    return counts
+
+def weights_from_history(con, role_deltas, first, last, base=100):
+    # B/R/I as if everybody started at `base` on `first` and was charged role_deltas
+    # (Config.deltas) for every assignment up to `last`. Zero weights stay zero and
+    # nobody else drops below 1, so they can still be picked.
+    roles = tuple(role_deltas)
+    weights = {col: {} for col in roles}
+    for mem_id, *current in con.execute(f'SELECT No, {", ".join(roles)} FROM ABA'):
+        for col, w in zip(roles, current):
+            weights[col][mem_id] = base if w != 0 else 0
+    for mem_id, counts in window_counts(con, first, last, roles).items():
+        if mem_id not in weights[roles[0]]:
+            continue
+        for role, n in counts.items():
+            for col, delta in role_deltas[role]:
+                if weights[col][mem_id] != 0:
+                    weights[col][mem_id] = max(1, weights[col][mem_id] + delta * n)
+    return weights
+
+def main_history(argv=None):
+    parser = argparse.ArgumentParser(description="Query the assignment history in ABA.db.")
+    parser.add_argument('--db', default='ABA.db', help="Database file")
+    parser.add_argument('--config', metavar='FILE', help="Masses/roles config (default: listgen.toml if present)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    member = sub.add_parser('member', help="Every assignment of one member")
+    member.add_argument('no', type=int, help="Member No")
+    member.add_argument('--days', type=int, help="Only the last N days up to --end")
+    member.add_argument('--end', help="Last date, YYYY-MM-DD (default today)")
+    counts = sub.add_parser('window', help="B/R/I counts per member in a rolling window")
+    counts.add_argument('--days', type=int, default=90, help="Window length in days")
+    counts.add_argument('--end', help="Last date, YYYY-MM-DD (default today)")
+    weights = sub.add_parser('weights', help="Recompute B/R/I weights from the window")
+    weights.add_argument('--days', type=int, default=90, help="Window length in days")
+    weights.add_argument('--end', help="Last date, YYYY-MM-DD (default today)")
+    weights.add_argument('--apply', action='store_true', help="Write the weights to ABA (default: only print them)")
+    args = parser.parse_args(argv)
+
+    con = sqlite3.connect(args.db) if getattr(args, 'apply', False) else sqlite3.connect(f'file:{args.db}?mode=ro', uri=True)
+    if not has_history(con):
+        parser.error(f'{args.db} has no ASSIGNMENTS yet, generate a month first.')
+    names = dict(con.execute('SELECT No, NAME FROM ABA'))
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.command == 'member':
+        first, last = window(args.end, args.days) if args.days else (None, args.end)
+        rows = member_history(con, args.no, first, last)
+        print(f'{names.get(args.no, args.no)}: {len(rows)} assignments')
+        for when, slot, role in rows:
+            print(f'     {when} {calendar.day_abbr[date.fromisoformat(when).weekday()]} mass {slot[1]} {role}')
+    elif args.command == 'window':
+        first, last = window(args.end, args.days)
+        print(f'{first} .. {last}')
+        print(f'     No {"".join(f"{role:>3}" for role in config.roles)}  NAME')
+        for mem_id, c in sorted(window_counts(con, first, last, config.roles).items(), key=lambda item: -sum(item[1].values())):
+            print(f'{mem_id:>7}{"".join(f"{c[role]:>3}" for role in config.roles)}  {names.get(mem_id, "")}')
+    else:
+        first, last = window(args.end, args.days)
+        weights = weights_from_history(con, config.deltas, first, last, config.default_weight)
+        print(f'Weights from {first} .. {last}')
+        for mem_id in names:
+            print(f'{mem_id:>7}{"".join(f" {weights[role][mem_id]:>4}" for role in config.roles)}  {names[mem_id]}')
+        if args.apply:
+            with con:
+                con.executemany(f'UPDATE ABA SET {", ".join(f"{role} = ?" for role in config.roles)} WHERE No = ?',
+                                [tuple(weights[role][m] for role in config.roles) + (m,) for m in names])
+            print('Weights saved')
+    con.close()
+
+if __name__ == '__main__':
+    main_history()
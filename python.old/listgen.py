@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+# Library API and a small local HTTP/JSON service around main.py.
+#   python3 listgen.py --port 8765
+#   curl -d '{"year": 2025, "month": 5, "seed": 1}' localhost:8765/preview
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlparse
+import argparse
+import json
+import random
+import sqlite3
+
+from config import load_config
+from exporters import export, read_sqlite_schedule
+from fairness import fairness_report
+from history import month_schedule
+import main
+
+class ListGen:
+    # Keeps one connection plus names, weights and the availability index in memory
+    # between calls. They are reloaded only when another connection has committed to
+    # the DB (PRAGMA data_version), our own saves update the cache directly.
+    def __init__(self, db='ABA.db', engine='python', read_only=False, config=None):
+        # config: a config.Config, a TOML path or None for listgen.toml/the default
+        self.config = config if hasattr(config, 'roles') else load_config(config)
+        self.owns_con = not isinstance(db, sqlite3.Connection)
+        self.con = main.open_db(db, read_only) if self.owns_con else db
+        self.engine = engine
+        self.read_only = read_only
+        self.data_version = None
+        self.timer = main.PhaseTimer()
+        self.timer.watch(self.con)
+        self.refresh()
+
+    def refresh(self):
+        version = self.con.execute('PRAGMA data_version').fetchone()[0]
+        if version == self.data_version:
+            return
+        c = self.con.cursor()
+        with self.timer.phase('load_members'):
+            self.names = main.load_names(c)
+            self.weights = main.load_weights(c, self.config.roles)
+            self.availability = main.load_availability(c, self.config.slots)
+        self.data_version = version
+
+    def build(self, months, seed=None, dry_run=False):
+        # [(year, month, schedule), ...] plus the run info, the cache follows a saved run
+        self.refresh()
+        seed = seed if seed is not None else random.randrange(2 ** 32)
+        weights = main.copy_weights(self.weights)
+        schedules = main.run_months(self.availability, months, weights, random.Random(seed), self.engine, False, self.timer, self.config)
+        run = {'seed': seed, 'engine': self.engine, 'dry_run': dry_run}
+        if not dry_run:
+            main.finish_run(self.con, self.weights, weights, False, self.timer, run, schedules)
+            self.weights = weights
+            for key in ('weights_before', 'weights_after'):
+                del run[key]
+        return schedules, run
+
+    def generate(self, year, month, seed=None, formats=('csv',)):
+        # Saves weights and history and writes the outputs, like `main.py MM YYYY`
+        if self.read_only:
+            raise ValueError('ListGen was opened read-only, use preview()')
+        schedules, run = self.build([(year, month)], seed)
+        run['files'] = export(schedules[0][2], self.names, year, month, formats, self.con, self.config)
+        return self.result(year, month, schedules[0][2], run)
+
+    def preview(self, year, month, seed=None):
+        # Same schedule as generate() with that seed, nothing is saved or written
+        schedules, run = self.build([(year, month)], seed, dry_run=True)
+        return self.result(year, month, schedules[0][2], run)
+
+    def report(self, year, month):
+        # Fairness report of a month that was generated before
+        self.refresh()
+        schedule = (month_schedule(self.con, year, month, self.config.roles)
+                    or read_sqlite_schedule(self.con, year, month, self.config))
+        if schedule is None:
+            raise ValueError(f'{month}/{year} has not been generated yet')
+        return {'year': year, 'month': month, 'report': fairness_report(schedule, self.names, config=self.config)}
+
+    def result(self, year, month, schedule, run):
+        return {
+            'year': year, 'month': month, **run,
+            'schedule': {day: [dict(zip(self.config.roles, slot)) for slot in slots] for day, slots in schedule.items()},
+            'names': {mem_id: self.names[mem_id] for slots in schedule.values() for slot in slots for mem_id in slot},
+            'report': fairness_report(schedule, self.names, config=self.config),
+        }
+
+    def close(self):
+        if self.owns_con:
+            self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class Handler(BaseHTTPRequestHandler):
+    # GET/POST /preview, /report and /health, POST only for /generate since it saves
+    # weights and history and writes files. Parameters come from the query string
+    # and/or a JSON body. HTTPServer handles one request at a time, so the connection
+    # is only ever used from one thread.
+    listgen = None
+
+    def do_GET(self):
+        self.handle_call('GET')
+
+    def do_POST(self):
+        self.handle_call('POST')
+
+    def handle_call(self, method):
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            if length:
+                params.update(json.loads(self.rfile.read(length)))
+            if url.path == '/health':
+                self.reply(200, {'members': len(self.listgen.names), 'engine': self.listgen.engine, 'read_only': self.listgen.read_only})
+                return
+            call = {'/generate': self.listgen.generate, '/preview': self.listgen.preview, '/report': self.listgen.report}.get(url.path)
+            if call is None:
+                self.reply(404, {'error': f'unknown call {url.path}, use /generate, /preview, /report or /health'})
+                return
+            if url.path == '/generate' and method != 'POST':
+                self.reply(405, {'error': '/generate saves weights and history, use POST'}, {'Allow': 'POST'})
+                return
+            year, month = int(params['year']), int(params['month'])
+            if not 1 <= month <= 12:
+                raise ValueError(f'invalid month {month}')
+            kwargs = {}
+            if 'seed' in params and call != self.listgen.report:
+                kwargs['seed'] = int(params['seed'])
+            if 'formats' in params and call == self.listgen.generate:
+                formats = params['formats']
+                kwargs['formats'] = main.export_formats(formats if isinstance(formats, str) else ','.join(formats))
+            self.reply(200, call(year, month, **kwargs))
+        except (KeyError, ValueError, TypeError, argparse.ArgumentTypeError) as e:
+            self.reply(400, {'error': f'missing parameter {e}' if isinstance(e, KeyError) else str(e)})
+        except Exception as e:
+            # e.g. sqlite3.Error on a locked or missing DB, the client still gets JSON
+            self.log_error('%s failed: %r', url.path, e)
+            self.reply(500, {'error': f'{type(e).__name__}: {e}'})
+
+    def reply(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+def serve(listgen, host='127.0.0.1', port=8765):
+    Handler.listgen = listgen
+    server = HTTPServer((host, port), Handler)
+    print(f'Serving {listgen.engine} engine on http://{host}:{server.server_port} (Ctrl+C to stop)')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+def main_serve(argv=None):
+    parser = argparse.ArgumentParser(description="Serve generate/preview/report as local HTTP/JSON calls.")
+    parser.add_argument('--db', default='ABA.db', help="Database file")
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    parser.add_argument('--engine', choices=['python', 'numpy', 'flow'], default='python', help="Selection engine")
+    parser.add_argument('--read-only', action='store_true', help="Only preview and report, never write to the DB")
+    parser.add_argument('--config', metavar='FILE', help="Masses/roles config (default: listgen.toml if present)")
+    args = parser.parse_args(argv)
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    with ListGen(args.db, args.engine, args.read_only, config) as listgen:
+        serve(listgen, args.host, args.port)
+
+if __name__ == '__main__':
+    main_serve()
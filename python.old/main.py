@@ -1,56 +1,204 @@
 #!/usr/bin/python3
-from collections import Counter
+from collections import Counter, deque
+from contextlib import contextmanager
+from itertools import repeat
 import sqlite3
 import random
 import calendar
-import csv
 import argparse
-import re
+import importlib.util
+import json
+import sys
+import time
 
-print('Created by @oivas000')
+from config import DEFAULT, WEEK_NAMES, load_config
+from schedule import Schedule
 
-def week_count(year, month, week):
-    return sum(row.count(week) for row in month_info)
+# The default 7 x 3 masses and B/R/I roles, see config.py for other layouts
+SLOTS = DEFAULT.slots
+SLOT_INDEX = DEFAULT.slot_index
+ROLES = DEFAULT.roles
 
-def month_dict(year, month):
-    month_info
-    global month_dict
-    month_dict = {num: val for day, week in zip(month_cal, month_info) for num, val in zip(day, week)}
-    try:
-        del month_dict[0]
-    except KeyError:
-        print('No Zero value Found')
-    #print(month_dict)
-    return month_dict
-
-def get_real_name(mem_id):
-    rn = c.execute(f'SELECT NAME FROM ABA WHERE No = {mem_id}')
-	#print(rn.fetchall())
-    return rn.fetchall()
-
-def set_weight(col, mem_id, weight):
-    c.execute(f'UPDATE ABA SET {col} = {col}+{weight} WHERE No = {mem_id}')
-    con.commit()
-    #print(f'Added {weight} {col} weight to member : {mem_id} {get_real_name(mem_id)[0][0]}')
+def week_count(days, week):
+    return sum(1 for d in days.values() if d == week)
 
-def reset_weight():
-    c.execute('''
+def month_dict(year, month):
+    # {day of month: weekday letter}, e.g. {1: 'h', 2: 'f', ...}
+    month_cal = calendar.monthcalendar(year, month)
+    return {num: WEEK_NAMES[i] for week in month_cal for i, num in enumerate(week) if num != 0}
+
+def load_names(c):
+    # {No: NAME} for every member, built once per run
+    return dict(c.execute('SELECT No, NAME FROM ABA'))
+
+def name_schedule(schedule, names):
+    # Schedules are carried as member Nos, names are only looked up for output
+    return {day: [tuple(names[mem_id] for mem_id in slot) for slot in slots] for day, slots in schedule.items()}
+
+def load_weights(c, roles=ROLES):
+    # Whole ABA table in one SELECT: {'B': {No: weight}, 'R': {...}, 'I': {...}}
+    weights = {role: {} for role in roles}
+    for mem_id, *row in c.execute(f'SELECT No, {", ".join(roles)} FROM ABA'):
+        for role, w in zip(roles, row):
+            weights[role][mem_id] = w
+    return weights
+
+def weight_members(weights):
+    # Member Nos in table order
+    return next(iter(weights.values()))
+
+class Availability:
+    # Member x slot availability from one scan of ABA: a bitmask per member (bit k is
+    # slots[k]) and the member Nos of every slot in table order
+    def __init__(self, rows, slots=SLOTS):
+        self.slots = slots
+        self.slot_index = {slot: k for k, slot in enumerate(slots)}
+        self.masks = {}
+        self.slot_members = {slot: [] for slot in slots}
+        for mem_id, *flags in rows:
+            mask = 0
+            for k, flag in enumerate(flags):
+                if flag == 1:
+                    mask |= 1 << k
+                    self.slot_members[slots[k]].append(mem_id)
+            self.masks[mem_id] = mask
+
+    def scarcity_order(self):
+        # Slots with the fewest available members first (stable, same as ORDER BY x_count)
+        return sorted(self.slots, key=lambda slot: len(self.slot_members[slot]))
+
+    def is_available(self, mem_id, slot):
+        return bool(self.masks.get(mem_id, 0) >> self.slot_index[slot] & 1)
+
+def load_availability(c, slots=SLOTS):
+    return Availability(c.execute(f'SELECT No, {", ".join(slots)} FROM ABA'), slots)
+
+def copy_weights(weights):
+    return {col: dict(col_weights) for col, col_weights in weights.items()}
+
+def set_weight(weights, col, mem_id, weight):
+    weights[col][mem_id] += weight
+    #print(f'Added {weight} {col} weight to member : {mem_id}')
+
+# What random_selector() charges for each role it hands out, {'B': (('B', -10), ('R', -5)), ...}
+ROLE_DELTAS = DEFAULT.deltas
+
+def charge_role(weights, role, mem_id, sign=1, deltas=ROLE_DELTAS):
+    # sign=-1 refunds an assignment that was taken back
+    for col, weight in deltas[role]:
+        set_weight(weights, col, mem_id, sign * weight)
+
+def bump_weights(weights, weight):
+    # Same as the old end-of-month UPDATE: zero weights stay zero
+    for col in weights:
+        col_weights = weights[col]
+        for mem_id, w in col_weights.items():
+            if w != 0:
+                col_weights[mem_id] = w + weight
+
+def weight_deltas(start_weights, weights):
+    # (dB, dR, dI, No) for every member whose weights moved during this run
+    deltas = []
+    for mem_id in weight_members(weights):
+        delta = tuple(weights[col][mem_id] - start_weights[col][mem_id] for col in weights)
+        if any(delta):
+            deltas.append(delta + (mem_id,))
+    return deltas
+
+def save_weights(con, deltas, roles=ROLES):
+    # Runs in the caller's transaction, see finish_run
+    con.executemany(f'UPDATE ABA SET {", ".join(f"{role} = {role} + ?" for role in roles)} WHERE No = ?', deltas)
+    return len(deltas)
+
+def open_db(path, read_only=False):
+    if read_only:
+        return sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    con = sqlite3.connect(path)
+    con.execute('PRAGMA journal_mode = WAL')
+    con.execute('PRAGMA synchronous = NORMAL')
+    return con
+
+def reset_weight(con, config=DEFAULT):
+    columns = ',\n'.join(f'            {role} = CASE WHEN {role} = 0 THEN 0 ELSE {int(config.default_weight)} END' for role in config.roles)
+    con.execute(f'''
         UPDATE ABA
         SET
-            B = CASE WHEN B = 0 THEN 0 ELSE 100 END,
-            R = CASE WHEN R = 0 THEN 0 ELSE 100 END,
-            I = CASE WHEN I = 0 THEN 0 ELSE 100 END
+{columns}
     ''')
     con.commit()
-    print("Weights reset, preserving zeros.")
-
-def get_weight(col, mem_id):
-    rn = c.execute(f'SELECT {col} FROM ABA WHERE No = ?', (mem_id,))
-	#print(rn.fetchall())
-    return rn.fetchall()
+    print("Weights reset, preserving zeros. ASSIGNMENTS history is kept.")
+
+def get_weight(weights, col, mem_id):
+    return weights[col][mem_id]
+
+class PhaseTimer:
+    # Wall time, CPU time and SQL statements per named phase, summed over repeated
+    # phases (e.g. one per month). SQL is only counted on connections passed to watch().
+    def __init__(self):
+        self.phases = {}
+        self.nested = set()
+        self.statements = 0
+
+    def watch(self, con):
+        con.set_trace_callback(self.count_statement)
+
+    def count_statement(self, statement):
+        self.statements += 1
+
+    @contextmanager
+    def phase(self, name):
+        wall, cpu, statements = time.perf_counter(), time.process_time(), self.statements
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu, self.statements - statements)
+
+    def add(self, name, wall, cpu, statements):
+        totals = self.phases.setdefault(name, [0.0, 0.0, 0])
+        totals[0] += wall
+        totals[1] += cpu
+        totals[2] += statements
+
+    def merge(self, phases, parent):
+        # Phases measured elsewhere (a worker) while `parent` was running here. They
+        # are listed as parent/name and left out of TOTAL, parent already counts them.
+        for name, totals in phases.items():
+            self.add(f'{parent}/{name}', *totals)
+            self.nested.add(f'{parent}/{name}')
+
+    @property
+    def timings(self):
+        return {name: totals[0] for name, totals in self.phases.items()}
+
+    def summary(self):
+        return {name: {'wall': round(wall, 6), 'cpu': round(cpu, 6), 'sql': sql} for name, (wall, cpu, sql) in self.phases.items()}
+
+    def print_summary(self):
+        width = max([len(name) for name in self.phases] + [5])
+        print(f"\n{'PHASE'.ljust(width)}  {'WALL s':>9}  {'CPU s':>9}  {'SQL':>7}")
+        for name, (wall, cpu, sql) in self.phases.items():
+            print(f'{name.ljust(width)}  {wall:9.4f}  {cpu:9.4f}  {sql:7d}')
+        wall, cpu, sql = (sum(totals[k] for name, totals in self.phases.items() if name not in self.nested) for k in range(3))
+        print(f"{'TOTAL'.ljust(width)}  {wall:9.4f}  {cpu:9.4f}  {sql:7d}")
+
+class ScheduleBuilder:
+    # Picked [b, r, i] groups queued per slot key ('m1' ... 'u3')
+    def __init__(self, slots=SLOTS):
+        self.queues = {slot: deque() for slot in slots}
+
+    def add(self, slot, group):
+        self.queues[slot].append(group)
+
+    def shuffle(self, rng=random):
+        for queue in self.queues.values():
+            rng.shuffle(queue)
+
+    def take(self, slot):
+        return self.queues[slot].popleft()
 
 class ProgressBar:
-    def __init__(self, total, prefix='Progress', length=56, fill='█', animation=None):
+    def __init__(self, total, prefix='Progress', length=56, fill='█', animation=None, enabled=True):
+        self.enabled = enabled
         self.total = total
         self.prefix = prefix
         self.length = length
@@ -60,6 +208,8 @@ class ProgressBar:
 
     def update(self, progress):
         self.current = progress
+        if not self.enabled:
+            return
         percent = int(100 * self.current / self.total)
         filled_length = int(self.length * self.current // self.total)
         bar = self.fill * filled_length + '-' * (self.length - filled_length)
@@ -67,470 +217,609 @@ class ProgressBar:
         print(f'\r{self.prefix} |{bar}| {percent}% {anim}', end='')
 
     def complete(self):
-        print()
-
-def analyze_frequencies(schedule):
-    b_names = []
-    r_names = []
-    i_names = []
-
-    # Collect names from the schedule
-    for date, slots in schedule.items():
-        for slot in slots:
-            b_names.append(slot[0])  # Bible reading names
-            r_names.append(slot[1])  # Reading names
-            i_names.append(slot[2])  # Incense names
-
-    # Count frequencies
-    b_counter = Counter(b_names)
-    r_counter = Counter(r_names)
-    i_counter = Counter(i_names)
-
-    # Get all names from the database
-    all_names = [row[0] for row in c.execute("SELECT NAME FROM ABA").fetchall()]
-
-    # Find missing names
-    missing_in_b = set(all_names) - set(b_counter.keys())
-    missing_in_r = set(all_names) - set(r_counter.keys())
-    missing_in_i = set(all_names) - set(i_counter.keys())
-
-    # Get top 10 most and least frequent names
-    top_10_b = b_counter.most_common(10)
-    least_10_b = b_counter.most_common()[:-11:-1]
-    top_10_r = r_counter.most_common(10)
-    least_10_r = r_counter.most_common()[:-11:-1]
-    top_10_i = i_counter.most_common(10)
-    least_10_i = i_counter.most_common()[:-11:-1]
-
-    # Display results
-    print("\nTop 10 Most Bible Reading (B):")
-    for name, count in top_10_b:
-        print(f"     {name} ({count})")
-    print("\nTop 10 Least Bible Reading (B):")
-    for name, count in least_10_b:
-        print(f"     {name} ({count})")
-    print("\nNames Not Assigned in Bible Reading (B):")
-    if missing_in_b:
-        for name in missing_in_b:
-            print(f"     {name}")
-    else:
-        print("     None")
-
-    print("\nTop 10 Most Reading (R):")
-    for name, count in top_10_r:
-        print(f"     {name} ({count})")
-    print("\nTop 10 Least Reading (R):")
-    for name, count in least_10_r:
-        print(f"     {name} ({count})")
-    print("\nNames Not Assigned in Reading (R):")
-    if missing_in_r:
-        for name in missing_in_r:
-            print(f"     {name}")
-    else:
-        print("     None")
-
-    print("\nTop 10 Most Incense (I):")
-    for name, count in top_10_i:
-        print(f"     {name} ({count})")
-    print("\nTop 10 Least Incense (I):")
-    for name, count in least_10_i:
-        print(f"     {name} ({count})")
-    print("\nNames Not Assigned in Incense (I):")
-    if missing_in_i:
-        for name in missing_in_i:
-            print(f"     {name}")
-    else:
-        print("     None")
-    """
-    repeats = []
-
-    for day, groups in schedule.items():
-        for i, group in enumerate(groups):
-            seen = set()
-            duplicates = [name for name in group if name in seen or seen.add(name)]
-            if duplicates:
-                repeats.append((day, i + 1, group, duplicates))
-
-    # Output the repeated entries
-    for day, group_num, group, duplicates in repeats:
-        print(f"DAY {day}, HOLY MASS {group_num}: {group} -> REPETITIONS: {duplicates}")
-    """
+        if self.enabled:
+            print()
+
+def analyze_frequencies(schedule, names, report_formats=(), year=None, month=None, config=DEFAULT, k=10):
+    # Prints the per-role summary (top/least k) and returns (report, files written), see fairness.py
+    from fairness import fairness_report, print_report, write_report
+    report = fairness_report(schedule, names, k, config)
+    print_report(report, names, config, k)
+    files = write_report(report, names, year, month, report_formats) if report_formats else []
+    return report, files
 
 def fix_schedule(schedule):
     """
     Resolve adjacent-day conflicts in the schedule.
-    - schedule: dict mapping day (int or str) -> list of (bible, reading, incense) tuples.
-    - year, month: integers for calendar.weekday if day keys are numeric.
-    Returns a new schedule dict with conflicts resolved.
+    - schedule: a Schedule, conflicts are the same member on the same mass and role
+      on two consecutive days.
+    Returns a new Schedule with conflicts resolved.
+    Day pairs are only revisited when they still have a conflict or one of
+    their days changed, each swap check is a lookup in the per-day Counter.
     """
-    # Map letters to weekday index if keys are strings.
-    weekday_map = {'M': 0, 'T': 1, 'W': 2, 'R': 3, 'F': 4, 'S': 5, 'U': 6}
-
-    # Build numeric mapping for days
-    key_to_num = {}
-    num_to_key = {}
-    numeric_schedule = {}
-
-    # Parse keys: if int, use directly; if str, extract digits for day.
-    for key, slots in schedule.items():
-        if isinstance(key, int):
-            day_num = key
-        else:
-            m = re.search(r'\d+', key)
-            if m:
-                day_num = int(m.group())
-            else:
-                # Skip keys without a numeric day part
+    schedule = schedule.copy()
+    cells, width, roles = schedule.cells, schedule.width, schedule.roles
+    first, last = schedule.first, schedule.first + len(schedule) - 1
+
+    # Members on each day, a Counter since one person may serve more than one mass
+    occupancy = {day: Counter(schedule.day_members(day)) for day in schedule}
+    # Adjacent day pairs (d, d + 1), keyed by d
+    pairs = range(first, last)
+
+    def has_conflict(d):
+        start = schedule.offset(d)
+        return any(cells[k] and cells[k] == cells[k + width] for k in range(start, start + width))
+
+    def try_swap(day, cell, person):
+        # Swap 'person' out of day with whoever has the same cell (mass and role) 1-4 weeks away
+        for offset in (7, -7, 14, -14, 21, -21, 28, -28):
+            target = day + offset
+            if not first <= target <= last:
+                continue
+
+            other = cells[schedule.offset(target) + cell]
+            if not other or other == person:
+                continue
+            # 'other' must not already be on day, 'person' must not be on target
+            if occupancy[day][other] or occupancy[target][person]:
                 continue
 
-        key_to_num[key] = day_num
-        if day_num not in num_to_key:
-            num_to_key[day_num] = key
-        # Convert each tuple to a mutable list for swapping
-        numeric_schedule[day_num] = [list(slot) for slot in slots]
+            cells[schedule.offset(day) + cell] = other
+            cells[schedule.offset(target) + cell] = person
+            occupancy[day][person] -= 1
+            occupancy[day][other] += 1
+            occupancy[target][other] -= 1
+            occupancy[target][person] += 1
+            # Pairs around the two changed days have to be looked at again
+            for changed in (day, target):
+                pending.update(p for p in (changed - 1, changed) if first <= p < last)
+            return True
+        return False
+
+    # Worklist of day pairs that (may) have a conflict
+    pending = {d for d in pairs if has_conflict(d)}
 
     # Up to 20 passes or until no changes
     for _ in range(20):
         changes = 0
-        # Sorted list of numeric days for adjacency
-        days = sorted(numeric_schedule.keys())
-
-        # Check each consecutive day pair
-        for idx in range(len(days) - 1):
-            d = days[idx]
-            next_d = days[idx + 1]
-            # Only consider truly adjacent days
-            if next_d != d + 1:
-                continue
 
-            tasks_d = numeric_schedule[d]
-            tasks_next = numeric_schedule[next_d]
-            # Compare slot-by-slot
-            min_slots = min(len(tasks_d), len(tasks_next))
-            for slot in range(min_slots):
-                # Before checking tasks, set found_swap = False for this slot
-                found_swap = False
-
-                # Check each task in (bible, reading, incense)
-                for task_idx in range(3):
-                    person_d = tasks_d[slot][task_idx]
-                    person_n = tasks_next[slot][task_idx]
-
-                    # Conflict if same person on same task
-                    if person_d and person_d == person_n:
-                        person = person_n
-
-                        # Attempt swapping using day (next_d) as the conflict day
-                        for offset in (7, -7, 14, -14, 21, -21, 28, -28):
-                            target = next_d + offset
-                            if target not in numeric_schedule:
-                                continue
-                            if slot >= len(numeric_schedule[target]):
-                                continue
-
-                            other = numeric_schedule[target][slot][task_idx]
-                            if not other or other == person:
-                                continue
-
-                            # Ensure 'other' is not already on next_d elsewhere
-                            if any(
-                                other == t
-                                for i, t in enumerate(tasks_next[slot])
-                                if i != task_idx
-                            ) or any(
-                                other == t
-                                for s in tasks_next
-                                for t in s
-                                if s is not tasks_next[slot]
-                            ):
-                                continue
-
-                            # Ensure 'person' is not already on target day elsewhere
-                            if any(
-                                person == t
-                                for s in numeric_schedule[target]
-                                for t in s
-                                if s is not numeric_schedule[target][slot]
-                            ):
-                                continue
-
-                            # Check slot uniqueness after swap:
-                            # In next_d: replacing person by other
-                            if any(
-                                other == t
-                                for i, t in enumerate(tasks_next[slot])
-                                if i != task_idx
-                            ):
-                                continue
-                            # In target day: replacing other by person
-                            if any(
-                                person == t
-                                for i, t in enumerate(numeric_schedule[target][slot])
-                                if i != task_idx
-                            ):
-                                continue
-
-                            # Perform swap
-                            tasks_next[slot][task_idx] = other
-                            numeric_schedule[target][slot][task_idx] = person
-                            found_swap = True
+        # Same order as a full scan, pairs without conflicts are skipped
+        for d in pairs:
+            if d not in pending:
+                continue
+            pending.discard(d)
+            start = schedule.offset(d)
+
+            for slot in range(0, width, roles):
+                for cell in range(slot, slot + roles):
+                    person = cells[start + width + cell]
+                    # Conflict if same person on same task, try moving it off d + 1 first, then off d
+                    if person and cells[start + cell] == person:
+                        if try_swap(d + 1, cell, person) or try_swap(d, cell, person):
                             changes += 1
+                            # One swap per slot and pass
                             break
 
-                        # If not swapped yet, try swapping person on day d instead
-                        if not found_swap:
-                            for offset in (7, -7, 14, -14, 21, -21, 28, -28):
-                                target = d + offset
-                                if target not in numeric_schedule:
-                                    continue
-                                if slot >= len(numeric_schedule[target]):
-                                    continue
-
-                                other = numeric_schedule[target][slot][task_idx]
-                                if not other or other == person:
-                                    continue
-
-                                # Check distinctness on day d
-                                if any(
-                                    other == t
-                                    for s in tasks_d
-                                    for t in s
-                                    if s is not tasks_d[slot]
-                                ):
-                                    continue
-
-                                # Ensure 'person' not on target day elsewhere
-                                if any(
-                                    person == t
-                                    for s in numeric_schedule[target]
-                                    for t in s
-                                    if s is not numeric_schedule[target][slot]
-                                ):
-                                    continue
-
-                                # Slot uniqueness checks
-                                if any(
-                                    other == t
-                                    for i, t in enumerate(tasks_d[slot])
-                                    if i != task_idx
-                                ):
-                                    continue
-                                if any(
-                                    person == t
-                                    for i, t in enumerate(numeric_schedule[target][slot])
-                                    if i != task_idx
-                                ):
-                                    continue
-
-                                # Perform swap
-                                tasks_d[slot][task_idx] = other
-                                numeric_schedule[target][slot][task_idx] = person
-                                found_swap = True
-                                changes += 1
-                                break
-
-                        # Once we’ve attempted a swap for this conflict, break out
-                        if found_swap:
-                            break
-
-                # If we found a swap for this slot, move on to next slot
-                if found_swap:
-                    continue
+            # Unresolved conflicts are retried in the next pass
+            if has_conflict(d):
+                pending.add(d)
 
         # If no changes this pass, schedule is stable
         if changes == 0:
             break
 
-    # Reconstruct schedule in original key format
-    new_schedule = {}
-    for day_num, slots in numeric_schedule.items():
-        orig_key = num_to_key.get(day_num, day_num)
-        # Convert lists back to tuples
-        new_schedule[orig_key] = [tuple(slot) for slot in slots]
-
-    return new_schedule
-
-def organize_schedule():
-    schedule = {}
-    for e in month_dict:
-        d = month_dict[e]
-        l1 = eval(f'{d}1l')
-        l2 = eval(f'{d}2l')
-        l3 = eval(f'{d}3l')
-
-        schedule[e] = [
-            (get_real_name(l1[0][0])[0][0], get_real_name(l1[0][1])[0][0], get_real_name(l1[0][2])[0][0]),
-            (get_real_name(l2[0][0])[0][0], get_real_name(l2[0][1])[0][0], get_real_name(l2[0][2])[0][0]),
-            (get_real_name(l3[0][0])[0][0], get_real_name(l3[0][1])[0][0], get_real_name(l3[0][2])[0][0]),
-        ]
-
-        del l1[0]
-        del l2[0]
-        del l3[0]
-    #a1=schedule
-    #a2 = fix_schedule(schedule)
-    #print(a1)
-    #print(a2)
-    #return a2
-    return fix_schedule(schedule)
-
-def csv_writer(schedule):
-    with open(f'DAILY BIBLE READING LIST {month_name} {year}.csv', 'w', newline='') as Bfile, \
-         open(f'DAILY READING LIST {month_name} {year}.csv', 'w', newline='') as Rfile, \
-         open(f'DAILY INCENSE LIST {month_name} {year}.csv', 'w', newline='') as Ifile:
-
-        b_writer = csv.writer(Bfile)
-        r_writer = csv.writer(Rfile)
-        i_writer = csv.writer(Ifile)
-        b_writer.writerow([f'DAILY BIBLE READING LIST {month_name} {year}', '', '', ''])
-        b_writer.writerow(['DATE', '6:00 am', '7:30 am', '5:00 pm'])
-        r_writer.writerow([f'DAILY READING LIST {month_name} {year}', '', '', ''])
-        r_writer.writerow(['DATE', '6:00 am', '7:30 am', '5:00 pm'])
-        i_writer.writerow([f'DAILY INCENSE LIST {month_name} {year}', '', '', ''])
-        i_writer.writerow(['DATE', '6:00 am', '7:30 am', '5:00 pm'])
-
-        for date, slots in schedule.items():
-            b_writer.writerow([date] + [slot[0] for slot in slots])
-            r_writer.writerow([date] + [slot[1] for slot in slots])
-            i_writer.writerow([date] + [slot[2] for slot in slots])
-
-def arranger(b, r, i, d, t):
-    var_name = f"{d}{t}l"
-    var_value = eval(var_name)
-    var_value.append([b, r, i])
-
-def random_selector(tuple_mems_ids, d, t):
-    B_db_weights = [get_weight('B', mem_id)[0][0] for mem_id in tuple_mems_ids]
-    R_db_weights = [get_weight('R', mem_id)[0][0] for mem_id in tuple_mems_ids]
-    I_db_weights = [get_weight('I', mem_id)[0][0] for mem_id in tuple_mems_ids]
-    #print(B_db_weights)
-    #print(R_db_weights)
-    #print(I_db_weights)
-
-    B_max_weights = max(B_db_weights); B_weights = [w if w == B_max_weights else 0 for w in B_db_weights]
-    #print(B_weights)
-
-    R_max_weights = max(R_db_weights); R_weights = [w if w == R_max_weights else 0 for w in R_db_weights]
-    #print(R_weights)
-
-    I_max_weights = max(I_db_weights); I_weights = [w if w == I_max_weights else 0 for w in I_db_weights]
-    #print(I_weights)
-
-    b = random.choices(tuple_mems_ids, weights=B_weights)[0]
-    r = random.choices(tuple_mems_ids, weights=R_weights)[0]
-    i = random.choices(tuple_mems_ids, weights=I_weights)[0]
-
-    # Select r != b
-    while True:
-        R_max_weights = max(R_db_weights)
-        R_weights = [w if w == R_max_weights else 0 for w in R_db_weights]
-        r = random.choices(tuple_mems_ids, weights=R_weights)[0]
-        if r != b:
-            break
-        R_db_weights[tuple_mems_ids.index(r)] -= 10
-
-    # Select i != b and i != r
-    while True:
-        I_max_weights = max(I_db_weights)
-        I_weights = [w if w == I_max_weights else 0 for w in I_db_weights]
-        i = random.choices(tuple_mems_ids, weights=I_weights)[0]
-        if i != b and i != r:
-            break
-        I_db_weights[tuple_mems_ids.index(i)] -= 10
-
-    arranger(int(b), int(r), int(i), d, t)
-    set_weight('B', b, -10)
-    set_weight('R', b, -5)
-    #set_weight('I', b, -5)
-    set_weight('R', r, -10)
-    set_weight('B', r, -5)
-    #set_weight('I', r, -5)
-    set_weight('I', i, -10)
-    #set_weight('B', i, -5)
-    #set_weight('R', i, -5)
-    #print('BIBLE   :', b, get_real_name(b)[0][0])
-    #print('READING :', r, get_real_name(r)[0][0])
-    #print('INCENSE :', i, get_real_name(r)[0][0])
-    return b, r, i
-
-def main():
-    progress = ProgressBar(21)
-    for l in week_names:
-        for n in range(1,4):
-            columns.append(f"{l}{n}")
-    query_parts = []
-    for col in columns:
-        query_parts.append(f"SELECT '{col}' AS column_name, SUM(CASE WHEN {col} = '1' THEN 1 ELSE 0 END) AS x_count FROM ABA")
-    full_query = " UNION ALL ".join(query_parts) + " ORDER BY x_count ASC"
-    c.execute(full_query)
-    least_mems = [(col[0],) for col in c.fetchall()]
+    return schedule
+
+def organize_schedule(days, builder, config=DEFAULT):
+    schedule = Schedule(days, config.masses, len(config.roles))
+    for e, d in days.items():
+        for mass in range(schedule.masses):
+            schedule.set_slot(e, mass, builder.take(f'{d}{mass + 1}'))
+    return schedule
+
+def top_weights(db_weights):
+    # Only the highest weight stays in the draw
+    max_weight = max(db_weights)
+    return [w if w == max_weight else 0 for w in db_weights]
+
+def random_selector(weights, tuple_mems_ids, slot, builder, rng=random, config=DEFAULT):
+    # One member per role (B, R, I in the default config), each drawn among the highest
+    # weights for that role and different from the roles picked before it
+    db_weights = [[get_weight(weights, role, mem_id) for mem_id in tuple_mems_ids] for role in config.roles]
+
+    # A first draw for every role, only the first role's pick is kept as is
+    picks = [rng.choices(tuple_mems_ids, weights=top_weights(role_weights))[0] for role_weights in db_weights]
+
+    # Select r != b, then i != b and i != r, ...
+    for k in range(1, len(picks)):
+        while True:
+            pick = rng.choices(tuple_mems_ids, weights=top_weights(db_weights[k]))[0]
+            if pick not in picks[:k]:
+                break
+            db_weights[k][tuple_mems_ids.index(pick)] -= 10
+        picks[k] = pick
+
+    builder.add(slot, [int(pick) for pick in picks])
+    for role, pick in zip(config.roles, picks):
+        charge_role(weights, role, pick, deltas=config.deltas)
+    return tuple(picks)
+
+def build_month(availability, year, month, weights, rng=random, engine='python', show_progress=True, timer=None, config=DEFAULT):
+    # Selection, shuffle and conflict fixing for one month. Updates weights in place
+    # (including the end-of-month bump, +20 by default) and returns a Schedule of member Nos
+    timer = timer or PhaseTimer()
+    days = month_dict(year, month)
+    if engine == 'flow':
+        from flow_engine import solve_month
+        with timer.phase('flow'):
+            schedule = solve_month(availability, days, weights, config)
+        # Same-role repeats are already avoided by the solver where possible, this only
+        # catches what a single date could not avoid
+        with timer.phase('fix_schedule'):
+            schedule = fix_schedule(schedule)
+        with timer.phase('bump_weights'):
+            bump_weights(weights, config.monthly_bump)
+        return schedule
+    builder = ScheduleBuilder(config.slots)
+    if engine == 'numpy':
+        from numpy_engine import NumpySelector
+        selector = NumpySelector(weights, rng, config)
+    progress = ProgressBar(len(config.slots), enabled=show_progress)
+    least_mems = availability.scarcity_order()
     #print(least_mems)
     i=1
-    month_dict(year, month)
-    for mass in least_mems:
-        #print(mass[0])
-        dt = mass[0]
-        d, t = dt[0], dt[1]
+    for dt in least_mems:
+        d = dt[0]
         #print('\n' + day[d] + ' ' + time[t])
-        mems_ids = c.execute(f'SELECT No FROM ABA WHERE {mass[0]} = 1', ())
-        tuple_mems_ids = [id[0] for id in mems_ids.fetchall()]
+        tuple_mems_ids = availability.slot_members[dt]
         #print(tuple_mems_ids)
 
-        for e in range(week_count(year, month, d)):
-            random_selector(tuple_mems_ids, d, int(t))
+        with timer.phase('selection'):
+            if engine == 'numpy':
+                cands = selector.candidates(tuple_mems_ids)
+                for e in range(week_count(days, d)):
+                    selector.select(cands, dt, builder)
+            else:
+                for e in range(week_count(days, d)):
+                    random_selector(weights, tuple_mems_ids, dt, builder, rng, config)
         progress.update(i)
         i=i+1
     progress.complete()
-
-    for letter in week_names:
-        for number in range(1,4):
-            var_name = f"{letter}{number}l"
-            var_value = eval(var_name)
-            random.shuffle(eval(var_name))
-            #print(eval(var_name))
-            #print(f"{var_name} {var_value}")
-
-    schedule = organize_schedule()
-    analyze_frequencies(schedule)
-    csv_writer(schedule)
-
-    #print('\n')
-    #print(no_of_mems)
-
-    c.execute('''
-        UPDATE ABA
-        SET
-            B = CASE WHEN B = 0 THEN 0 ELSE B + 20 END,
-            R = CASE WHEN R = 0 THEN 0 ELSE R + 20 END,
-            I = CASE WHEN I = 0 THEN 0 ELSE I + 20 END
-    ''')
-    con.commit()
-
-    #for tmid in tuple_mems_ids:
-        #print(get_real_name(tmid)[0][0])
-
-with sqlite3.connect('ABA.db') as con:
-    c = con.cursor()
-    print('Database Opened')
+    if engine == 'numpy':
+        selector.sync(weights)
+
+    with timer.phase('shuffle'):
+        builder.shuffle(rng)
+    with timer.phase('organize_schedule'):
+        schedule = organize_schedule(days, builder, config)
+    with timer.phase('fix_schedule'):
+        schedule = fix_schedule(schedule)
+    with timer.phase('bump_weights'):
+        bump_weights(weights, config.monthly_bump)
+    return schedule
+
+def regenerate(schedule, year, month, availability, weights, changed_members=(), changed_slots=(), from_day=1, rng=random, config=DEFAULT):
+    # Incremental update of an already generated month. Cells on or after from_day
+    # that hold a changed member, or sit in a changed slot, are checked against the
+    # current availability and weights; only the cells whose member can no longer
+    # serve are reassigned. Everything else is left untouched.
+    # Returns (new schedule, [(day, mass, role, old No, new No), ...])
+    days = month_dict(year, month)
+    schedule = schedule.copy()
+    changed_members, changed_slots = set(changed_members), set(changed_slots)
+    # Who can serve is judged on the weights as loaded, refunds below must not
+    # make a member with a weight of 0 look eligible again for their other cells
+    start = copy_weights(weights)
+    changes = []
+    for day in schedule:
+        if day < from_day:
+            continue
+        for mass in range(schedule.masses):
+            col = f'{days[day]}{mass + 1}'
+            for k, role in enumerate(config.roles):
+                old = schedule.cell(day, mass, k)
+                if old not in changed_members and col not in changed_slots:
+                    continue
+                if start[role].get(old, 0) > 0 and availability.is_available(old, col):
+                    continue
+                new = pick_replacement(schedule, day, mass, k, col, availability, weights, rng, config.roles)
+                schedule.set_cell(day, mass, k, new)
+                if old in weights[role]:
+                    charge_role(weights, role, old, -1, config.deltas)
+                    for weight_col, _ in config.deltas[role]:
+                        if start[weight_col][old] == 0:
+                            weights[weight_col][old] = 0
+                charge_role(weights, role, new, deltas=config.deltas)
+                changes.append((day, mass + 1, role, old, new))
+    return schedule, changes
+
+def pick_replacement(schedule, day, mass, k, col, availability, weights, rng=random, roles=ROLES):
+    # Same rule as random_selector (highest current weight, ties at random), among
+    # members free that day; holding the same mass/role the day before or after
+    # (what fix_schedule avoids) is only accepted when there is nobody else.
+    role = roles[k]
+    busy = set(schedule.day_members(day))
+    neighbours = {schedule.cell(d, mass, k) for d in (day - 1, day + 1) if d in schedule}
+    free = [m for m in availability.slot_members[col] if m not in busy and weights[role].get(m, 0) > 0]
+    cands = [m for m in free if m not in neighbours] or free
+    if not cands:
+        raise ValueError(f'Nobody left to take {role} at {col} on day {day}')
+    top = max(weights[role][m] for m in cands)
+    return rng.choice([m for m in cands if weights[role][m] == top])
+
+def month_range(text):
+    # 'YYYY-MM:YYYY-MM' (inclusive) -> [(year, month), ...]
+    try:
+        first, last = (tuple(int(x) for x in part.split('-')) for part in text.split(':'))
+        if not (1 <= first[1] <= 12 and 1 <= last[1] <= 12):
+            raise ValueError
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid range '{text}', expected YYYY-MM:YYYY-MM")
+    if first > last:
+        raise argparse.ArgumentTypeError(f"range '{text}' ends before it starts")
+    months = []
+    year, month = first
+    while (year, month) <= last:
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def run_months(availability, months, weights, rng=random, engine='python', show_progress=True, timer=None, config=DEFAULT):
+    return [(year, month, build_month(availability, year, month, weights, rng, engine, show_progress, timer, config)) for year, month in months]
+
+def finish_run(con, start_weights, weights, dry_run=False, timer=None, manifest=None, schedules=()):
+    # Saves the weight changes and appends the schedules to ASSIGNMENTS (history.py)
+    timer = timer or PhaseTimer()
+    deltas = weight_deltas(start_weights, weights)
+    if manifest is not None:
+        manifest['members'] = len(weight_members(weights))
+        manifest['weights_before'] = {mem_id: [start_weights[col][mem_id] for col in start_weights] for mem_id in weight_members(start_weights)}
+        manifest['weights_after'] = {mem_id: [weights[col][mem_id] for col in weights] for mem_id in weight_members(weights)}
+    if dry_run:
+        print(f'\nDry run: {len(deltas)} members\' weight changes not saved')
+    else:
+        # One transaction for the weights and the history of the whole run, a crash
+        # leaves the old weights and no ASSIGNMENTS rows
+        with con:
+            if not con.in_transaction:
+                con.execute('BEGIN')
+            with timer.phase('save_weights'):
+                save_weights(con, deltas, tuple(weights))
+            if schedules:
+                from history import record_assignments
+                with timer.phase('save_history'):
+                    run = record_assignments(con, schedules, tuple(weights))
+        if schedules and manifest is not None:
+            manifest['history_run'] = run
+
+def generate_range(months, db, dry_run=False, rng=random, engine='python', timer=None, manifest=None, config=DEFAULT,
+                   show_progress=True):
+    # Consecutive months in one run: weights are carried in memory from one month to
+    # the next and saved once at the end. Returns [(year, month, schedule), ...]
+    # db is a path (opened and closed here) or an open connection (left open).
+    timer = timer or PhaseTimer()
+    owns_con = isinstance(db, str)
+    con = open_db(db, read_only=dry_run) if owns_con else db
+    if owns_con:
+        timer.watch(con)
+    try:
+        c = con.cursor()
+        with timer.phase('load_weights'):
+            weights = load_weights(c, config.roles)
+        with timer.phase('availability'):
+            availability = load_availability(c, config.slots)
+        start_weights = copy_weights(weights)
+        schedules = run_months(availability, months, weights, rng, engine, show_progress, timer, config)
+        finish_run(con, start_weights, weights, dry_run, timer, manifest, schedules)
+    finally:
+        if owns_con:
+            con.close()
+    return schedules
+
+def run_candidate(availability, months, weights, seed, engine='python', config=DEFAULT):
+    # One candidate, usually in a worker process, on its own copy of the weights
+    weights = copy_weights(weights)
+    timer = PhaseTimer()
+    schedules = run_months(availability, months, weights, random.Random(seed), engine, False, timer, config)
+    return seed, schedules, weights, timer.phases
+
+def score_schedules(schedules, members):
+    # Lower is better, compared in order: adjacent-day repeats of the same
+    # mass/role, members never assigned, stddev of per-member assignment counts
+    counts = dict.fromkeys(members, 0)
+    repeats = 0
+    for year, month, schedule in schedules:
+        for day, slots in schedule.items():
+            for slot in slots:
+                for mem_id in slot:
+                    counts[mem_id] += 1
+            next_slots = schedule.get(day + 1)
+            if next_slots:
+                repeats += sum(a == b for s1, s2 in zip(slots, next_slots) for a, b in zip(s1, s2))
+    import statistics
+    values = list(counts.values())
+    return repeats, values.count(0), round(statistics.pstdev(values), 4)
+
+def generate_best(months, db_path, candidates, jobs=1, dry_run=False, rng=random, engine='python', timer=None, manifest=None, config=DEFAULT):
+    # Generate independent seeded candidates (in a process pool when jobs > 1) and
+    # keep the best scoring one. Returns (seed, [(year, month, schedule), ...])
+    timer = timer or PhaseTimer()
+    con = open_db(db_path, read_only=dry_run)
+    timer.watch(con)
+    with timer.phase('load_weights'):
+        weights = load_weights(con.cursor(), config.roles)
+    with timer.phase('availability'):
+        availability = load_availability(con.cursor(), config.slots)
+    start_weights = copy_weights(weights)
+    seeds = [rng.getrandbits(32) for _ in range(candidates)]
+    args = (repeat(availability), repeat(months), repeat(weights), seeds, repeat(engine), repeat(config))
+    with timer.phase('candidates'):
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(run_candidate, *args))
+        else:
+            results = [run_candidate(*a) for a in zip(*args)]
+    scored = [(score_schedules(schedules, weight_members(weights)), seed, schedules, w, p) for seed, schedules, w, p in results]
+    score, seed, schedules, best_weights, best_phases = min(scored, key=lambda res: res[0])
+    print(f'Best of {candidates} candidates: seed {seed} (repeats {score[0]}, unassigned {score[1]}, spread {score[2]})')
+    # Phases of the winning candidate, as measured in its worker
+    timer.merge(best_phases, 'candidates')
+    if manifest is not None:
+        manifest['candidate_seed'] = seed
+        manifest['candidate_score'] = list(score)
+    finish_run(con, start_weights, best_weights, dry_run, timer, manifest, schedules)
+    con.close()
+    return seed, schedules
+
+def update_month(year, month, db, changed_members=(), changed_slots=(), from_day=1, source=None,
+                 dry_run=False, rng=random, timer=None, manifest=None, config=DEFAULT):
+    # Loads a generated month (SCHEDULE table first, then the CSVs unless source is
+    # given), runs regenerate() and saves only the weight deltas of the changed cells.
+    # Returns (schedule, changes)
+    timer = timer or PhaseTimer()
+    owns_con = isinstance(db, str)
+    con = open_db(db, read_only=dry_run) if owns_con else db
+    try:
+        c = con.cursor()
+        with timer.phase('load_weights'):
+            weights = load_weights(c, config.roles)
+        with timer.phase('availability'):
+            availability = load_availability(c, config.slots)
+        start_weights = copy_weights(weights)
+        from exporters import read_csv_schedule, read_sqlite_schedule
+        with timer.phase('load_schedule'):
+            schedule = read_sqlite_schedule(con, year, month, config) if source != 'csv' else None
+            if schedule is None and source == 'sqlite':
+                raise ValueError(f'No SCHEDULE rows for {month}/{year}')
+            if schedule is None:
+                schedule = read_csv_schedule(year, month, load_names(c), config)
+        with timer.phase('regenerate'):
+            schedule, changes = regenerate(schedule, year, month, availability, weights, changed_members, changed_slots, from_day, rng, config)
+        finish_run(con, start_weights, weights, dry_run, timer, manifest, [(year, month, schedule)])
+    finally:
+        if owns_con:
+            con.close()
+    return schedule, changes
+
+def generate(year, month, db, dry_run=False, rng=random, engine='python', config=DEFAULT):
+    # Library entry point: db is a path or an open sqlite3 connection
+    return generate_range([(year, month)], db, dry_run, rng, engine, config=config, show_progress=False)[0][2]
+
+def member_list(text):
+    try:
+        return [int(x) for x in text.split(',') if x.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid member list '{text}', expected Nos like 1012,1015")
+
+def slot_list(text):
+    # Checked against the config's slots in cmd_generate
+    return [x.strip() for x in text.split(',') if x.strip()]
+
+def export_formats(text):
+    from exporters import SINKS
+    formats = [fmt.strip() for fmt in text.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in SINKS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown format '{', '.join(unknown)}', choose from {', '.join(SINKS)}")
+    return formats
+
+def report_formats(text):
+    from fairness import REPORTS
+    formats = [fmt.strip() for fmt in text.split(',') if fmt.strip()]
+    unknown = [fmt for fmt in formats if fmt not in REPORTS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"unknown report format '{', '.join(unknown)}', choose from {', '.join(REPORTS)}")
+    return formats
+
+def write_manifest(manifest, months):
+    # JSON next to the CSVs with everything needed to replay and compare the run
+    first = f'{str.upper(calendar.month_name[months[0][1]])} {months[0][0]}'
+    last = f'{str.upper(calendar.month_name[months[-1][1]])} {months[-1][0]}'
+    path = f'RUN MANIFEST {first}.json' if first == last else f'RUN MANIFEST {first} - {last}.json'
+    with open(path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+# Subcommands that live in their own module, the rest of the command line is passed on
+PASSTHROUGH = {
+    'bench': ('bench', 'main_bench', "Benchmark on synthetic databases (main.py bench --help)"),
+    'history': ('history', 'main_history', "Query the ASSIGNMENTS history (main.py history --help)"),
+    'serve': ('listgen', 'main_serve', "Local HTTP/JSON service (main.py serve --help)"),
+}
+COMMANDS = ['generate', 'reset', 'report'] + list(PASSTHROUGH)
+
+def build_parser():
     parser = argparse.ArgumentParser(description="Script to generate a schedule from a SQLite DB for a custom purpose.")
-    parser.add_argument('month', type=int, nargs='?', help="Month in MM")
-    parser.add_argument('year', type=int, nargs='?', help="Year in YYYY")
-    parser.add_argument("--reset", "-r", action="store_true", help="Resets weights to default")
-    args = parser.parse_args()
-    if args.reset:
-        reset_weight()
-        exit()
+    sub = parser.add_subparsers(dest='command', metavar='COMMAND')
+    gen = sub.add_parser('generate', help="Generate the lists for a month or a range (default)")
+    gen.add_argument('month', type=int, nargs='?', help="Month in MM")
+    gen.add_argument('year', type=int, nargs='?', help="Year in YYYY")
+    gen.add_argument("--db", default='ABA.db', help="Database file")
+    gen.add_argument("--config", metavar='FILE', help="Masses/roles config (default: listgen.toml if present, else 7 x 3 masses with B/R/I)")
+    gen.add_argument("--range", type=month_range, metavar='YYYY-MM:YYYY-MM', help="Generate consecutive months in one run")
+    gen.add_argument("--dry-run", "-n", action="store_true", help="Generate and report without writing to the DB")
+    gen.add_argument("--engine", choices=['python', 'numpy', 'flow'], default='python',
+                     help="Selection engine: python (default), numpy (needs NumPy) or flow (min-cost flow, no randomness)")
+    gen.add_argument("--candidates", type=int, default=1, metavar='N', help="Generate N seeded candidates and keep the fairest")
+    gen.add_argument("--jobs", "-j", type=int, default=1, metavar='K', help="Worker processes for --candidates")
+    gen.add_argument("--seed", type=int, help="Random seed, a run with the same seed and DB state is reproduced exactly")
+    gen.add_argument("--format", type=export_formats, default=['csv'], metavar='FMT[,FMT...]',
+                     help="Outputs: csv (three lists), combined (one CSV), jsonl, sqlite (SCHEDULE table in ABA.db)")
+    gen.add_argument("--report", type=report_formats, default=[], metavar='FMT[,FMT...]',
+                     help="Also write the fairness report: json and/or csv (FAIRNESS <MONTH> <YEAR>.*)")
+    gen.add_argument("--update", "-u", action="store_true", help="Incremental: reassign only the affected cells of an already generated month")
+    gen.add_argument("--changed-members", type=member_list, default=[], metavar='NO[,NO...]', help="With --update: members whose cells are checked")
+    gen.add_argument("--changed-slots", type=slot_list, default=[], metavar='SLOT[,SLOT...]', help="With --update: slots (m1 ... u3) whose cells are checked")
+    gen.add_argument("--from-day", type=int, default=1, help="With --update: leave days before this one untouched")
+    gen.add_argument("--source", choices=['sqlite', 'csv'], help="With --update: where to read the month from (default: SCHEDULE table, then CSVs)")
+    gen.add_argument("--profile", nargs='?', const='table', choices=['table', 'json'], help="Print wall/CPU time and SQL statements per phase")
+    gen.add_argument("--cprofile", metavar='FILE', help="Write cProfile stats of the run to FILE (read with pstats)")
+    reset = sub.add_parser('reset', help="Reset B/R/I weights to 100 (zeros and the history are kept)")
+    reset.add_argument("--db", default='ABA.db', help="Database file")
+    reset.add_argument("--config", metavar='FILE', help="Masses/roles config")
+    report = sub.add_parser('report', help="Fairness report of a month that was generated before")
+    report.add_argument('month', type=int, help="Month in MM")
+    report.add_argument('year', type=int, help="Year in YYYY")
+    report.add_argument("--db", default='ABA.db', help="Database file")
+    report.add_argument("--config", metavar='FILE', help="Masses/roles config")
+    report.add_argument("--format", type=report_formats, default=[], metavar='FMT[,FMT...]',
+                        help="Also write FAIRNESS <MONTH> <YEAR>.json and/or .csv")
+    for name, (module, func, help) in PASSTHROUGH.items():
+        sub.add_parser(name, help=help, add_help=False)
+    return parser
+
+def get_config(args, parser):
+    try:
+        return load_config(args.config)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+def cmd_reset(args, parser):
+    config = get_config(args, parser)
+    with open_db(args.db) as con:
+        reset_weight(con, config)
+
+def cmd_report(args, parser):
+    from exporters import read_sqlite_schedule
+    from history import month_schedule
+    config = get_config(args, parser)
+    con = open_db(args.db, read_only=True)
+    schedule = month_schedule(con, args.year, args.month, config.roles) or read_sqlite_schedule(con, args.year, args.month, config)
+    if schedule is None:
+        parser.error(f"{args.month}/{args.year} has not been generated yet (no ASSIGNMENTS or SCHEDULE rows).")
+    report, files = analyze_frequencies(schedule, load_names(con.cursor()), args.format, args.year, args.month, config)
+    con.close()
+    for path in files:
+        print(f'Report written to {path}')
+
+def cmd_generate(args, parser):
+    print('Created by @oivas000')
+    if args.range and args.month is not None:
+        parser.error("--range cannot be combined with month and year.")
+    if args.dry_run and 'sqlite' in args.format:
+        parser.error("--format sqlite writes to the DB and cannot be combined with --dry-run.")
+    if args.update and (args.range or args.candidates > 1):
+        parser.error("--update works on one month and cannot be combined with --range or --candidates.")
+    if args.update and not (args.changed_members or args.changed_slots):
+        parser.error("--update needs --changed-members and/or --changed-slots.")
+    config = get_config(args, parser)
+    unknown = [slot for slot in args.changed_slots if slot not in config.slot_index]
+    if unknown:
+        parser.error(f"unknown slot '{', '.join(unknown)}' in --changed-slots, expected {config.slots[0]} ... {config.slots[-1]}")
+    if args.candidates < 1 or args.jobs < 1:
+        parser.error("--candidates and --jobs must be at least 1.")
+    if args.engine == 'numpy' and importlib.util.find_spec('numpy') is None:
+        parser.error("--engine numpy needs NumPy installed.")
+    if args.range:
+        months = args.range
     elif args.month is None or args.year is None:
-        parser.error("The following arguments are required: month, year or -r for reseting weights.")
-    month = args.month
-    year = args.year
-    columns = []
-    m1l, m2l, m3l, t1l, t2l, t3l, w1l, w2l, w3l, h1l, h2l, h3l, f1l, f2l, f3l, s1l, s2l, s3l, u1l, u2l, u3l = [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], [], []
-    #day = {'m': 'MONDAY', 't': 'TUESDAY', 'w': 'WEDNESDAY', 'h': 'THURSDAY', 'f': 'FRIDAY', 's': 'SATURDAY', 'u': 'SUNDAY'}
-    #time = {'1': '6:00 AM', '2': '7:30 AM', '3': '5:00 PM'}
-    month_cal = calendar.monthcalendar(year, month)
-    month_name = str.upper(calendar.month_name[month])
-    week_names = ['m', 't', 'w', 'h', 'f', 's', 'u']
-    month_info = [[week_names[i] if week[i] != 0 else '' for i in range(len(week))] for week in month_cal]
+        parser.error("The following arguments are required: month, year or --range.")
+    else:
+        months = [(args.year, args.month)]
+    from exporters import export
+
+    with open_db(args.db, read_only=args.dry_run) as con:
+        print('Database Opened')
+        #day = {'m': 'MONDAY', 't': 'TUESDAY', 'w': 'WEDNESDAY', 'h': 'THURSDAY', 'f': 'FRIDAY', 's': 'SATURDAY', 'u': 'SUNDAY'}
+        #time = {'1': '6:00 AM', '2': '7:30 AM', '3': '5:00 PM'}
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        rng = random.Random(seed)
+        timer = PhaseTimer()
+        timer.watch(con)
+        if args.cprofile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        manifest = {
+            'seed': seed,
+            'months': [{'year': year, 'month': month} for year, month in months],
+            'engine': args.engine,
+            'candidates': args.candidates,
+            'dry_run': args.dry_run,
+        }
+        if args.update:
+            year, month = months[0]
+            manifest['update'] = {'changed_members': args.changed_members, 'changed_slots': args.changed_slots, 'from_day': args.from_day}
+            try:
+                schedule, changes = update_month(year, month, con, args.changed_members, args.changed_slots, args.from_day,
+                                                 args.source, args.dry_run, rng, timer, manifest, config)
+            except OSError as e:
+                parser.error(f"{month}/{year} has no SCHEDULE rows and its CSVs cannot be read: {e}")
+            except ValueError as e:
+                parser.error(f"cannot update {month}/{year}: {e}")
+            manifest['update']['changes'] = [list(change) for change in changes]
+            print(f'\n{len(changes)} cells reassigned')
+            for day, mass, role, old, new in changes:
+                print(f'     DAY {day}, HOLY MASS {mass}, {role}: {old} -> {new}')
+            schedules = [(year, month, schedule)]
+        elif args.candidates > 1:
+            candidate_seed, schedules = generate_best(months, args.db, args.candidates, args.jobs, args.dry_run, rng, args.engine, timer, manifest, config)
+        else:
+            schedules = generate_range(months, con, args.dry_run, rng, args.engine, timer, manifest, config)
+        names = load_names(con.cursor())
+        for year, month, schedule in schedules:
+            month_name = str.upper(calendar.month_name[month])
+            if len(schedules) > 1:
+                print(f'\n{month_name} {year}')
+            with timer.phase('analyze_frequencies'):
+                report, files = analyze_frequencies(schedule, names, args.report, year, month, config)
+            manifest.setdefault('fairness', []).append({'year': year, 'month': month} | {key: value for key, value in report.items() if key != 'counts'})
+            manifest.setdefault('files', []).extend(files)
+            with timer.phase('export'):
+                manifest.setdefault('files', []).extend(export(schedule, names, year, month, args.format, con, config))
+        if args.cprofile:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        manifest['timings'] = {name: round(seconds, 6) for name, seconds in timer.timings.items()}
+        if args.profile:
+            manifest['profile'] = timer.summary()
+        print(f'\nSeed {seed}, manifest written to {write_manifest(manifest, months)}')
+        if args.profile == 'json':
+            print(json.dumps(timer.summary(), indent=2))
+        elif args.profile:
+            timer.print_summary()
+        if args.cprofile:
+            print(f'cProfile stats written to {args.cprofile}')
+        print('Database Closed')
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # The old `main.py 5 2025 ...` and `main.py --reset` still work
+    if argv and argv[0] in ('--reset', '-r'):
+        argv = ['reset'] + argv[1:]
+    elif argv and argv[0] not in COMMANDS and argv[0] not in ('-h', '--help'):
+        argv = ['generate'] + argv
+    # Heavy modules are only imported by the subcommand that needs them
+    if argv and argv[0] in PASSTHROUGH:
+        module, func, help = PASSTHROUGH[argv[0]]
+        return getattr(importlib.import_module(module), func)(argv[1:])
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return
+    {'generate': cmd_generate, 'reset': cmd_reset, 'report': cmd_report}[args.command](args, parser)
+
+if __name__ == '__main__':
     main()
-    print('Database Closed')
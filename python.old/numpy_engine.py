@@ -0,0 +1,45 @@
+import numpy as np
+
+class NumpySelector:
+    # Same rules as main.random_selector, with every role's weights kept as an int
+    # array indexed by member position. Already chosen members are masked out instead
+    # of retried.
+    def __init__(self, weights, rng, config):
+        members = next(iter(weights.values()))
+        self.ids = np.fromiter(members.keys(), dtype=np.int64, count=len(members))
+        self.pos = {mem_id: p for p, mem_id in enumerate(members)}
+        self.cols = {col: np.fromiter((weights[col][m] for m in members), dtype=np.int64, count=len(self.ids)) for col in weights}
+        self.roles = config.roles
+        self.deltas = config.deltas
+        self.rng = np.random.default_rng(rng.getrandbits(64))
+
+    def candidates(self, mem_ids):
+        return np.fromiter((self.pos[m] for m in mem_ids), dtype=np.int64, count=len(mem_ids))
+
+    def pick(self, col, cands, exclude):
+        w = col[cands]
+        ok = np.ones(len(cands), dtype=bool)
+        for p in exclude:
+            ok &= cands != p
+        if not ok.any():
+            raise ValueError('Not enough members available for this mass')
+        top = w[ok].max()
+        if top <= 0:
+            raise ValueError('Total of weights must be greater than zero')
+        return cands[self.rng.choice(np.flatnonzero(ok & (w == top)))]
+
+    def select(self, cands, slot, builder):
+        picks = []
+        for role in self.roles:
+            picks.append(self.pick(self.cols[role], cands, picks))
+
+        builder.add(slot, [int(self.ids[p]) for p in picks])
+        for role, p in zip(self.roles, picks):
+            for col, delta in self.deltas[role]:
+                self.cols[col][p] += delta
+        return tuple(self.ids[p] for p in picks)
+
+    def sync(self, weights):
+        # Copy the arrays back into main's {'B': {No: weight}, ...} table
+        for col, arr in self.cols.items():
+            weights[col].update(zip(self.ids.tolist(), arr.tolist()))
@@ -0,0 +1,145 @@
+from array import array
+
+EMPTY = 0  # member No of a cell nobody has been put in yet
+
+class Schedule:
+    # One month of member Nos, days x masses x roles in a single flat array('i'):
+    # cell (day, mass, role) is at ((day - first) * masses + mass) * roles + role.
+    # Reads like the old {day: [(b, r, i), ...]} dict (items(), [day], get(), in,
+    # len()), the day and mass views below index straight into the array.
+    __slots__ = ('first', 'days', 'masses', 'roles', 'width', 'cells')
+
+    def __init__(self, days, masses=3, roles=3):
+        # days: the day numbers of the month (consecutive), e.g. month_dict(year, month)
+        days = sorted(days)
+        if days and days[-1] - days[0] + 1 != len(days):
+            raise ValueError(f'Schedule days must be consecutive, got {days}')
+        self.first = days[0] if days else 1
+        self.days = len(days)
+        self.masses, self.roles = masses, roles
+        self.width = masses * roles
+        self.cells = array('i', bytes(4 * self.days * self.width))
+
+    @classmethod
+    def from_dict(cls, schedule, masses=3, roles=3):
+        new = cls(schedule, masses, roles)
+        for day, slots in schedule.items():
+            for mass, slot in enumerate(slots):
+                new.set_slot(day, mass, slot)
+        return new
+
+    def copy(self):
+        new = Schedule((), self.masses, self.roles)
+        new.first, new.days = self.first, self.days
+        new.cells = array('i', self.cells)
+        return new
+
+    def offset(self, day):
+        # Index of the first cell of day
+        return (day - self.first) * self.width
+
+    def cell(self, day, mass, role):
+        return self.cells[(day - self.first) * self.width + mass * self.roles + role]
+
+    def set_cell(self, day, mass, role, mem_id):
+        self.cells[(day - self.first) * self.width + mass * self.roles + role] = mem_id
+
+    def set_slot(self, day, mass, members):
+        start = (day - self.first) * self.width + mass * self.roles
+        for k, mem_id in enumerate(members):
+            self.cells[start + k] = mem_id or EMPTY
+
+    def day_members(self, day):
+        start = (day - self.first) * self.width
+        return self.cells[start:start + self.width]
+
+    def __contains__(self, day):
+        return isinstance(day, int) and 0 <= day - self.first < self.days
+
+    def __getitem__(self, day):
+        if day not in self:
+            raise KeyError(day)
+        return DayView(self, day)
+
+    def get(self, day, default=None):
+        return DayView(self, day) if day in self else default
+
+    def __iter__(self):
+        return iter(range(self.first, self.first + self.days))
+
+    def keys(self):
+        return range(self.first, self.first + self.days)
+
+    def values(self):
+        return [DayView(self, day) for day in self]
+
+    def items(self):
+        return [(day, DayView(self, day)) for day in self]
+
+    def __len__(self):
+        return self.days
+
+    def __eq__(self, other):
+        if isinstance(other, Schedule):
+            return (self.first, self.masses, self.roles, self.cells) == (other.first, other.masses, other.roles, other.cells)
+        return NotImplemented
+
+    def to_dict(self):
+        return {day: [tuple(slot) for slot in slots] for day, slots in self.items()}
+
+    def __repr__(self):
+        return f'Schedule({self.to_dict()!r})'
+
+class DayView:
+    # The masses of one day
+    __slots__ = ('cells', 'start', 'masses', 'roles')
+
+    def __init__(self, schedule, day):
+        self.cells = schedule.cells
+        self.start = schedule.offset(day)
+        self.masses, self.roles = schedule.masses, schedule.roles
+
+    def __getitem__(self, mass):
+        if not 0 <= mass < self.masses:
+            raise IndexError(mass)
+        return MassView(self.cells, self.start + mass * self.roles, self.roles)
+
+    def __iter__(self):
+        return (MassView(self.cells, self.start + mass * self.roles, self.roles) for mass in range(self.masses))
+
+    def __len__(self):
+        return self.masses
+
+    def __repr__(self):
+        return repr([tuple(slot) for slot in self])
+
+class MassView:
+    # The roles (B, R, I) of one mass, writes go straight to the schedule
+    __slots__ = ('cells', 'start', 'roles')
+
+    def __init__(self, cells, start, roles):
+        self.cells, self.start, self.roles = cells, start, roles
+
+    def __getitem__(self, role):
+        if not 0 <= role < self.roles:
+            raise IndexError(role)
+        return self.cells[self.start + role]
+
+    def __setitem__(self, role, mem_id):
+        if not 0 <= role < self.roles:
+            raise IndexError(role)
+        self.cells[self.start + role] = mem_id
+
+    def __iter__(self):
+        return iter(self.cells[self.start:self.start + self.roles])
+
+    def __len__(self):
+        return self.roles
+
+    def __eq__(self, other):
+        if isinstance(other, (MassView, tuple, list)):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(tuple(self))
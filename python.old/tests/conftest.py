@@ -0,0 +1,5 @@
+import os
+import sys
+
+# main.py and friends are plain scripts next to this folder, not a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
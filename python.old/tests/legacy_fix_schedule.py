@@ -0,0 +1,198 @@
+# fix_schedule as it was before it was reworked around per-day occupancy, kept
+# to check that the new one gives the same schedules. Takes and returns the old
+# {day: [(b, r, i), ...]} dict.
+import re
+
+def fix_schedule(schedule):
+    """
+    Resolve adjacent-day conflicts in the schedule.
+    - schedule: dict mapping day (int or str) -> list of (bible, reading, incense) tuples.
+    - year, month: integers for calendar.weekday if day keys are numeric.
+    Returns a new schedule dict with conflicts resolved.
+    """
+    # Map letters to weekday index if keys are strings.
+    weekday_map = {'M': 0, 'T': 1, 'W': 2, 'R': 3, 'F': 4, 'S': 5, 'U': 6}
+
+    # Build numeric mapping for days
+    key_to_num = {}
+    num_to_key = {}
+    numeric_schedule = {}
+
+    # Parse keys: if int, use directly; if str, extract digits for day.
+    for key, slots in schedule.items():
+        if isinstance(key, int):
+            day_num = key
+        else:
+            m = re.search(r'\d+', key)
+            if m:
+                day_num = int(m.group())
+            else:
+                # Skip keys without a numeric day part
+                continue
+
+        key_to_num[key] = day_num
+        if day_num not in num_to_key:
+            num_to_key[day_num] = key
+        # Convert each tuple to a mutable list for swapping
+        numeric_schedule[day_num] = [list(slot) for slot in slots]
+
+    # Up to 20 passes or until no changes
+    for _ in range(20):
+        changes = 0
+        # Sorted list of numeric days for adjacency
+        days = sorted(numeric_schedule.keys())
+
+        # Check each consecutive day pair
+        for idx in range(len(days) - 1):
+            d = days[idx]
+            next_d = days[idx + 1]
+            # Only consider truly adjacent days
+            if next_d != d + 1:
+                continue
+
+            tasks_d = numeric_schedule[d]
+            tasks_next = numeric_schedule[next_d]
+            # Compare slot-by-slot
+            min_slots = min(len(tasks_d), len(tasks_next))
+            for slot in range(min_slots):
+                # Before checking tasks, set found_swap = False for this slot
+                found_swap = False
+
+                # Check each task in (bible, reading, incense)
+                for task_idx in range(3):
+                    person_d = tasks_d[slot][task_idx]
+                    person_n = tasks_next[slot][task_idx]
+
+                    # Conflict if same person on same task
+                    if person_d and person_d == person_n:
+                        person = person_n
+
+                        # Attempt swapping using day (next_d) as the conflict day
+                        for offset in (7, -7, 14, -14, 21, -21, 28, -28):
+                            target = next_d + offset
+                            if target not in numeric_schedule:
+                                continue
+                            if slot >= len(numeric_schedule[target]):
+                                continue
+
+                            other = numeric_schedule[target][slot][task_idx]
+                            if not other or other == person:
+                                continue
+
+                            # Ensure 'other' is not already on next_d elsewhere
+                            if any(
+                                other == t
+                                for i, t in enumerate(tasks_next[slot])
+                                if i != task_idx
+                            ) or any(
+                                other == t
+                                for s in tasks_next
+                                for t in s
+                                if s is not tasks_next[slot]
+                            ):
+                                continue
+
+                            # Ensure 'person' is not already on target day elsewhere
+                            if any(
+                                person == t
+                                for s in numeric_schedule[target]
+                                for t in s
+                                if s is not numeric_schedule[target][slot]
+                            ):
+                                continue
+
+                            # Check slot uniqueness after swap:
+                            # In next_d: replacing person by other
+                            if any(
+                                other == t
+                                for i, t in enumerate(tasks_next[slot])
+                                if i != task_idx
+                            ):
+                                continue
+                            # In target day: replacing other by person
+                            if any(
+                                person == t
+                                for i, t in enumerate(numeric_schedule[target][slot])
+                                if i != task_idx
+                            ):
+                                continue
+
+                            # Perform swap
+                            tasks_next[slot][task_idx] = other
+                            numeric_schedule[target][slot][task_idx] = person
+                            found_swap = True
+                            changes += 1
+                            break
+
+                        # If not swapped yet, try swapping person on day d instead
+                        if not found_swap:
+                            for offset in (7, -7, 14, -14, 21, -21, 28, -28):
+                                target = d + offset
+                                if target not in numeric_schedule:
+                                    continue
+                                if slot >= len(numeric_schedule[target]):
+                                    continue
+
+                                other = numeric_schedule[target][slot][task_idx]
+                                if not other or other == person:
+                                    continue
+
+                                # Check distinctness on day d
+                                if any(
+                                    other == t
+                                    for s in tasks_d
+                                    for t in s
+                                    if s is not tasks_d[slot]
+                                ):
+                                    continue
+
+                                # Ensure 'person' not on target day elsewhere
+                                if any(
+                                    person == t
+                                    for s in numeric_schedule[target]
+                                    for t in s
+                                    if s is not numeric_schedule[target][slot]
+                                ):
+                                    continue
+
+                                # Slot uniqueness checks
+                                if any(
+                                    other == t
+                                    for i, t in enumerate(tasks_d[slot])
+                                    if i != task_idx
+                                ):
+                                    continue
+                                if any(
+                                    person == t
+                                    for i, t in enumerate(numeric_schedule[target][slot])
+                                    if i != task_idx
+                                ):
+                                    continue
+
+                                # Perform swap
+                                tasks_d[slot][task_idx] = other
+                                numeric_schedule[target][slot][task_idx] = person
+                                found_swap = True
+                                changes += 1
+                                break
+
+                        # Once we’ve attempted a swap for this conflict, break out
+                        if found_swap:
+                            break
+
+                # If we found a swap for this slot, move on to next slot
+                if found_swap:
+                    continue
+
+        # If no changes this pass, schedule is stable
+        if changes == 0:
+            break
+
+    # Reconstruct schedule in original key format
+    new_schedule = {}
+    for day_num, slots in numeric_schedule.items():
+        orig_key = num_to_key.get(day_num, day_num)
+        # Convert lists back to tuples
+        new_schedule[orig_key] = [tuple(slot) for slot in slots]
+
+    return new_schedule
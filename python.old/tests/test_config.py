@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config import DEFAULT, load_config
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_example_is_the_default():
+    config = load_config(os.path.join(HERE, 'listgen.example.toml'))
+    for attr in ('mass_times', 'slots', 'roles', 'names', 'labels', 'titles', 'deltas', 'default_weight', 'monthly_bump'):
+        assert getattr(config, attr) == getattr(DEFAULT, attr)
+
+def test_custom(tmp_path):
+    path = tmp_path / 'listgen.toml'
+    path.write_text('''
+[masses]
+times = ["6:00 am", "7:30 am", "12:00 pm", "5:00 pm"]
+
+[[roles]]
+key = "B"
+charge = { B = -10, C = -5 }
+
+[[roles]]
+key = "C"
+name = "Cross"
+''')
+    config = load_config(str(path))
+    assert config.masses == 4 and config.slots[:5] == ['m1', 'm2', 'm3', 'm4', 't1']
+    assert config.roles == ('B', 'C')
+    assert config.deltas == {'B': (('B', -10), ('C', -5)), 'C': (('C', -10),)}
+    assert config.titles['C'] == 'DAILY CROSS LIST'
+
+@pytest.mark.parametrize('text, error', [
+    ('[[roles]]\nkey = "NAME"\n', 'cannot be used'),
+    ('[[roles]]\nkey = "B"\ncharge = { X = -10 }\n', 'unknown weight columns'),
+    ('[[roles]]\nkey = "B"\n[[roles]]\nkey = "B"\n', 'unique'),
+    ('[masses\n', 'listgen.toml'),
+])
+def test_invalid(tmp_path, text, error):
+    path = tmp_path / 'listgen.toml'
+    path.write_text(text)
+    with pytest.raises(ValueError, match=error):
+        load_config(str(path))
+
+def test_no_tomllib_without_a_file(tmp_path):
+    # main.py --help / reset / generate without listgen.toml must not need tomllib
+    code = 'import sys, main, config; config.load_config(); print("tomllib" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], cwd=tmp_path, env=os.environ | {'PYTHONPATH': HERE},
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == 'False'
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+
+import exporters
+from exporters import export, read_sqlite_schedule
+from schedule import Schedule
+
+NAMES = {1000 + n: f'Member {n}' for n in range(9)}
+
+def make_schedule():
+    schedule = Schedule(range(1, 31))
+    for day in schedule:
+        for mass in range(3):
+            schedule.set_slot(day, mass, [1000 + 3 * mass + k for k in range(3)])
+    return schedule
+
+@pytest.fixture
+def created(tmp_path, monkeypatch):
+    # Runs in tmp_path and remembers every sink export() creates
+    monkeypatch.chdir(tmp_path)
+    sinks = []
+    for fmt, cls in exporters.SINKS.items():
+        def make(*args, cls=cls):
+            sinks.append(cls(*args))
+            return sinks[-1]
+        monkeypatch.setitem(exporters.SINKS, fmt, make)
+    return sinks
+
+def files(sink):
+    return sink.files if hasattr(sink, 'files') else [sink.file] if hasattr(sink, 'file') else []
+
+def test_export(created):
+    con = sqlite3.connect(':memory:')
+    paths = export(make_schedule(), NAMES, 2025, 6, ['csv', 'combined', 'jsonl', 'sqlite'], con)
+    assert len(paths) == 5
+    assert all(f.closed for sink in created for f in files(sink))
+    assert read_sqlite_schedule(con, 2025, 6) == make_schedule()
+
+def test_failed_write_closes_everything(created):
+    con = sqlite3.connect(':memory:')
+    names = dict(NAMES)
+    del names[1004]
+    with pytest.raises(KeyError):
+        export(make_schedule(), names, 2025, 6, ['csv', 'jsonl', 'sqlite'], con)
+    assert len(created) == 3
+    assert all(f.closed for sink in created for f in files(sink))
+    # No half month in SCHEDULE
+    assert read_sqlite_schedule(con, 2025, 6) is None
+
+def test_failed_sink_closes_the_earlier_ones(created, monkeypatch):
+    class Broken:
+        def __init__(self, *args):
+            raise OSError('disk full')
+
+    monkeypatch.setitem(exporters.SINKS, 'jsonl', Broken)
+    with pytest.raises(OSError):
+        export(make_schedule(), NAMES, 2025, 6, ['csv', 'combined', 'jsonl'])
+    assert len(created) == 2
+    assert all(f.closed for sink in created for f in files(sink))
@@ -0,0 +1,26 @@
+from fairness import fairness_report, print_report
+from schedule import Schedule
+
+NAMES = {1000 + n: f'Member {n}' for n in range(12)}
+
+def make_schedule():
+    schedule = Schedule(range(1, 8))
+    for day in schedule:
+        for mass in range(3):
+            schedule.set_slot(day, mass, [1000 + (day + 3 * mass + k) % 10 for k in range(3)])
+    return schedule
+
+def test_report():
+    report = fairness_report(make_schedule(), NAMES, k=3)
+    assert report['members'] == 12 and report['days'] == 7
+    for stats in report['roles'].values():
+        assert len(stats['top']) == len(stats['bottom']) == 3
+        assert stats['missing'] == [1010, 1011]
+    assert sum(row['total'] for row in report['counts'].values()) == 7 * 9
+
+def test_print_report_uses_k(capsys):
+    report = fairness_report(make_schedule(), NAMES, k=3)
+    print_report(report, NAMES, k=3)
+    out = capsys.readouterr().out
+    assert 'Top 3 Most Bible Reading (B):' in out and 'Top 3 Least Incense (I):' in out
+    assert 'Top 10' not in out
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from legacy_fix_schedule import fix_schedule as legacy_fix_schedule
+from main import fix_schedule, month_dict
+from schedule import Schedule
+
+def random_schedule(seed, year, month, members, repeats=False):
+    # Small member pools so that the same member on the same mass and role on two
+    # consecutive days (what fix_schedule swaps away) happens a lot
+    rng = random.Random(seed)
+    pool = list(range(1000, 1000 + members))
+    schedule = {}
+    for day in month_dict(year, month):
+        people = rng.choices(pool, k=9) if repeats else rng.sample(pool, 9)
+        schedule[day] = [tuple(people[3 * mass:3 * mass + 3]) for mass in range(3)]
+    return schedule
+
+def conflicts(schedule):
+    return sum(a == b for day in schedule if day + 1 in schedule
+               for s1, s2 in zip(schedule[day], schedule[day + 1]) for a, b in zip(s1, s2))
+
+@pytest.mark.parametrize('seed', range(40))
+@pytest.mark.parametrize('year, month, members', [(2025, 2, 10), (2025, 5, 12), (2026, 8, 20)])
+def test_same_as_legacy(seed, year, month, members):
+    schedule = random_schedule(seed, year, month, members)
+    assert conflicts(schedule)
+    expected = legacy_fix_schedule(schedule)
+    assert fix_schedule(Schedule.from_dict(schedule)).to_dict() == expected
+
+@pytest.mark.parametrize('seed', range(20))
+def test_same_as_legacy_with_repeats(seed):
+    # One member on more than one mass of a day
+    schedule = random_schedule(seed, 2025, 5, 9, repeats=True)
+    assert fix_schedule(Schedule.from_dict(schedule)).to_dict() == legacy_fix_schedule(schedule)
+
+def test_input_untouched():
+    schedule = Schedule.from_dict(random_schedule(0, 2025, 5, 20))
+    before = schedule.to_dict()
+    fixed = fix_schedule(schedule)
+    assert schedule.to_dict() == before
+    assert conflicts(fixed.to_dict()) < conflicts(before)
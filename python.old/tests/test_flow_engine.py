@@ -0,0 +1,141 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+import bench
+from config import DEFAULT
+from flow_engine import MinCostFlow, solve_month
+import main
+
+def reference(n, edges, s, t, maxf):
+    # Successive shortest paths with Bellman-Ford, (flow, cost) of the cheapest flow
+    # of min(maxf, max flow) units. edges: [(u, v, cap, cost), ...] without negative cycles
+    graph = [[] for _ in range(n)]
+    for u, v, cap, cost in edges:
+        graph[u].append([v, cap, cost, len(graph[v])])
+        graph[v].append([u, 0, -cost, len(graph[u]) - 1])
+    flow = total = 0
+    while flow < maxf:
+        dist, prev = [None] * n, [None] * n
+        dist[s] = 0
+        for _ in range(n):
+            for u in range(n):
+                if dist[u] is None:
+                    continue
+                for k, (v, cap, cost, rev) in enumerate(graph[u]):
+                    if cap > 0 and (dist[v] is None or dist[u] + cost < dist[v]):
+                        dist[v], prev[v] = dist[u] + cost, (u, k)
+        if dist[t] is None:
+            break
+        f, v = maxf - flow, t
+        while v != s:
+            u, k = prev[v]
+            f = min(f, graph[u][k][1])
+            v = u
+        v = t
+        while v != s:
+            u, k = prev[v]
+            graph[u][k][1] -= f
+            graph[v][graph[u][k][3]][1] += f
+            v = u
+        flow += f
+        total += f * dist[t]
+    return flow, total
+
+def random_graph(rng, negative):
+    # Negative costs only on forward arcs (u < v), so there is no negative cycle
+    n = rng.randint(3, 8)
+    edges = []
+    for _ in range(rng.randint(n, 3 * n)):
+        u, v = rng.sample(range(n), 2)
+        if negative and u > v:
+            u, v = v, u
+        edges.append((u, v, rng.randint(1, 5), rng.randint(-8 if negative else 0, 10)))
+    return n, edges
+
+@pytest.mark.parametrize('negative', [False, True])
+@pytest.mark.parametrize('seed', range(150))
+def test_min_cost_flow(seed, negative):
+    rng = random.Random(seed)
+    n, edges = random_graph(rng, negative)
+    s, t = 0, n - 1
+    maxf = rng.choice([1, 3, 10 ** 6])
+    mcf = MinCostFlow()
+    for _ in range(n):
+        mcf.add_node()
+    arcs = [(mcf.add_edge(u, v, cap, cost), cap, cost) for u, v, cap, cost in edges]
+
+    flow = mcf.flow(s, t, maxf)
+    assert (flow, sum(mcf.flow_on(e) * cost for e, cap, cost in arcs)) == reference(n, edges, s, t, maxf)
+    assert all(0 <= mcf.flow_on(e) <= cap for e, cap, cost in arcs)
+    # Flow conservation away from s and t
+    net = [0] * n
+    for (u, v, cap, cost), (e, _, _) in zip(edges, arcs):
+        net[u] -= mcf.flow_on(e)
+        net[v] += mcf.flow_on(e)
+    assert net[t] == flow and all(x == 0 for x in net[1:-1])
+
+def test_initial_potentials():
+    # Negative costs are what makes flow() start from Bellman-Ford potentials
+    mcf = MinCostFlow()
+    for _ in range(4):
+        mcf.add_node()
+    mcf.add_edge(0, 1, 2, -5)
+    mcf.add_edge(1, 3, 2, 1)
+    mcf.add_edge(0, 2, 2, 0)
+    mcf.add_edge(2, 3, 2, -1)
+    assert mcf.initial_potentials(0) == [0, -5, 0, -4]
+    assert mcf.flow(0, 3, 3) == 3
+
+@pytest.fixture
+def db(tmp_path):
+    path = os.path.join(tmp_path, 'ABA.db')
+    bench.build_db(path, 30, 0.4, seed=3)
+    return sqlite3.connect(path)
+
+@pytest.mark.parametrize('year, month', [(2025, 2), (2025, 5), (2026, 8)])
+def test_solve_month(db, year, month):
+    c = db.cursor()
+    weights = main.load_weights(c)
+    start = main.copy_weights(weights)
+    availability = main.load_availability(c)
+    days = main.month_dict(year, month)
+    schedule = solve_month(availability, days, weights)
+
+    served = {}
+    for day, letter in days.items():
+        members = list(schedule.day_members(day))
+        assert 0 not in members
+        assert len(set(members)) == len(members)  # once per day at most
+        for mass in range(3):
+            for k, role in enumerate(DEFAULT.roles):
+                mem_id = schedule.cell(day, mass, k)
+                assert availability.is_available(mem_id, f'{letter}{mass + 1}')
+                assert start[role][mem_id] > 0
+                if day + 1 in schedule:
+                    # Never the same role on the next day, at any mass
+                    assert mem_id not in [schedule.cell(day + 1, m, k) for m in range(3)]
+                served.setdefault(mem_id, []).append(role)
+    # Weights are charged per config.deltas for every cell
+    expected = main.copy_weights(start)
+    for mem_id, roles in served.items():
+        for role in roles:
+            for col, delta in DEFAULT.deltas[role]:
+                expected[col][mem_id] += delta
+    assert weights == expected
+
+def test_not_enough_members(db):
+    with db:
+        db.execute('UPDATE ABA SET m1 = 0 WHERE No > 1001')
+    c = db.cursor()
+    with pytest.raises(ValueError, match=r'Not enough members available to fill every mass \(m1\)'):
+        solve_month(main.load_availability(c), main.month_dict(2025, 5), main.load_weights(c))
+
+def test_could_not_fill_every_role(db):
+    with db:
+        db.execute('UPDATE ABA SET B = 0')
+    c = db.cursor()
+    with pytest.raises(ValueError, match='Could not fill every role on day 1'):
+        solve_month(main.load_availability(c), main.month_dict(2025, 5), main.load_weights(c))
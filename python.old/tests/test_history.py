@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+
+from bench import ABA_DDL
+import history
+import main
+from schedule import Schedule
+
+def make_db():
+    con = sqlite3.connect(':memory:')
+    con.executescript(ABA_DDL)
+    with con:
+        con.executemany('INSERT INTO ABA (No, NAME) VALUES (?, ?)', [(1000 + n, f'Member {n}') for n in range(9)])
+    return con
+
+def make_run(con):
+    start = main.load_weights(con.cursor())
+    weights = main.copy_weights(start)
+    schedule = Schedule(main.month_dict(2025, 6))
+    for day in schedule:
+        for mass in range(3):
+            slot = [1000 + 3 * mass + k for k in range(3)]
+            schedule.set_slot(day, mass, slot)
+            for role, mem_id in zip(main.ROLES, slot):
+                main.charge_role(weights, role, mem_id)
+    return start, weights, [(2025, 6, schedule)]
+
+def test_finish_run_saves_weights_and_history():
+    con = make_db()
+    start, weights, schedules = make_run(con)
+    manifest = {}
+    main.finish_run(con, start, weights, manifest=manifest, schedules=schedules)
+
+    assert main.load_weights(con.cursor()) == weights
+    assert manifest['history_run'] == 1
+    assert con.execute('SELECT COUNT(*) FROM ASSIGNMENTS').fetchone()[0] == 30 * 9
+    assert history.month_schedule(con, 2025, 6).to_dict() == schedules[0][2].to_dict()
+
+def test_finish_run_is_one_transaction(monkeypatch):
+    con = make_db()
+    start, weights, schedules = make_run(con)
+    record_assignments = history.record_assignments
+
+    def broken(*args):
+        record_assignments(*args)
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(history, 'record_assignments', broken)
+    with pytest.raises(sqlite3.OperationalError):
+        main.finish_run(con, start, weights, schedules=schedules)
+
+    # Neither the weights nor the history (not even the table) were kept
+    assert main.load_weights(con.cursor()) == start
+    assert not history.has_history(con)
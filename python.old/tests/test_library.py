@@ -0,0 +1,49 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+import bench
+import main
+
+@pytest.fixture
+def opened(tmp_path, monkeypatch):
+    # Runs in tmp_path with a synthetic ABA.db, remembers every connection main opens
+    monkeypatch.chdir(tmp_path)
+    bench.build_db('ABA.db', 30, 0.5)
+    cons = []
+    open_db = main.open_db
+
+    def recording(*args, **kwargs):
+        cons.append(open_db(*args, **kwargs))
+        return cons[-1]
+
+    monkeypatch.setattr(main, 'open_db', recording)
+    return cons
+
+def closed(con):
+    try:
+        con.execute('SELECT 1')
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+def test_generate_closes_its_connection(opened, capsys):
+    schedule = main.generate(2025, 5, 'ABA.db', rng=random.Random(1))
+    assert len(schedule) == 31
+    assert len(opened) == 1 and closed(opened[0])
+    # No progress bar on the library path
+    assert capsys.readouterr().out == ''
+
+def test_generate_leaves_a_passed_connection_open(opened):
+    con = sqlite3.connect('ABA.db')
+    main.generate(2025, 5, con, rng=random.Random(1))
+    assert not opened and not closed(con)
+
+def test_update_month_closes_its_connection(opened):
+    main.generate_range([(2025, 5)], 'ABA.db', rng=random.Random(1), show_progress=False)
+    # No SCHEDULE rows and no CSVs: the error still closes the connection
+    with pytest.raises(ValueError):
+        main.update_month(2025, 5, 'ABA.db', changed_members=[1003], source='sqlite')
+    assert len(opened) == 2 and all(closed(con) for con in opened)
@@ -0,0 +1,76 @@
+from http.server import HTTPServer
+import json
+import sqlite3
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from listgen import Handler
+
+class FakeListGen:
+    # Stands in for ListGen, the handler only needs these
+    names = {1000: 'Member 0'}
+    engine = 'python'
+    read_only = True
+
+    def __init__(self):
+        self.generated = []
+
+    def preview(self, year, month, seed=None):
+        return {'year': year, 'month': month, 'seed': seed}
+
+    def generate(self, year, month, seed=None, formats=('csv',)):
+        if seed is None:
+            raise RuntimeError('out of members')
+        self.generated.append((year, month, seed))
+        return {'year': year, 'month': month, 'seed': seed}
+
+    def report(self, year, month):
+        raise sqlite3.OperationalError('database is locked')
+
+@pytest.fixture
+def url(monkeypatch):
+    monkeypatch.setattr(Handler, 'listgen', FakeListGen())
+    monkeypatch.setattr(Handler, 'log_message', lambda *args: None)
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+def call(url, body=None):
+    # GET, or POST when there is a body
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(url, data) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+def test_ok(url):
+    assert call(f'{url}/preview?year=2025&month=5&seed=1') == (200, {'year': 2025, 'month': 5, 'seed': 1})
+    assert call(f'{url}/health')[0] == 200
+
+def test_bad_request(url):
+    assert call(f'{url}/preview?year=2025') == (400, {'error': "missing parameter 'month'"})
+    assert call(f'{url}/preview?year=2025&month=13')[0] == 400
+    assert call(f'{url}/nothing')[0] == 404
+
+def test_server_error_is_json(url):
+    assert call(f'{url}/report?year=2025&month=5') == (500, {'error': 'OperationalError: database is locked'})
+    assert call(f'{url}/generate?year=2025&month=5', {}) == (500, {'error': 'RuntimeError: out of members'})
+    # The server is still up
+    assert call(f'{url}/health')[0] == 200
+
+def test_generate_needs_post(url):
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(f'{url}/generate?year=2025&month=5&seed=1')
+    assert (e.value.code, e.value.headers['Allow']) == (405, 'POST')
+    assert 'use POST' in json.load(e.value)['error']
+    assert Handler.listgen.generated == []
+    assert call(f'{url}/generate', {'year': 2025, 'month': 5, 'seed': 1}) == (200, {'year': 2025, 'month': 5, 'seed': 1})
+    assert Handler.listgen.generated == [(2025, 5, 1)]
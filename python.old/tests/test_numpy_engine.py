@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from config import DEFAULT
+from main import ScheduleBuilder, copy_weights
+from numpy_engine import NumpySelector
+
+MEMBERS = list(range(1000, 1012))
+
+def make_weights(rng):
+    # Few distinct values, so there are ties to break
+    return {role: {m: rng.choice((0, 90, 95, 100)) for m in MEMBERS} for role in DEFAULT.roles}
+
+@pytest.mark.parametrize('seed', range(10))
+def test_select(seed):
+    rng = random.Random(seed)
+    weights = make_weights(rng)
+    expected = copy_weights(weights)
+    selector = NumpySelector(weights, rng, DEFAULT)
+    builder = ScheduleBuilder()
+    for n in range(40):
+        mem_ids = rng.sample(MEMBERS, rng.randint(3, len(MEMBERS)))
+        try:
+            picks = selector.select(selector.candidates(mem_ids), 'm1', builder)
+        except ValueError as e:
+            # Never short of members here, only of weights above 0 for some role
+            assert str(e) == 'Total of weights must be greater than zero'
+            continue
+        picks = [int(p) for p in picks]
+        assert len(set(picks)) == len(picks)
+        assert list(builder.take('m1')) == picks
+        for k, role in enumerate(DEFAULT.roles):
+            # Top weight among the members not chosen yet for this mass
+            left = [m for m in mem_ids if m not in picks[:k]]
+            assert expected[role][picks[k]] == max(expected[role][m] for m in left) > 0
+        for role, mem_id in zip(DEFAULT.roles, picks):
+            for col, delta in DEFAULT.deltas[role]:
+                expected[col][mem_id] += delta
+    selector.sync(weights)
+    assert weights == expected
+
+def test_not_enough_members():
+    weights = {role: {m: 100 for m in MEMBERS} for role in DEFAULT.roles}
+    selector = NumpySelector(weights, random.Random(0), DEFAULT)
+    with pytest.raises(ValueError, match='Not enough members'):
+        selector.select(selector.candidates(MEMBERS[:2]), 'm1', ScheduleBuilder())
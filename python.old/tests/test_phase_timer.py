@@ -0,0 +1,13 @@
+from main import PhaseTimer
+
+def test_merged_phases_are_not_counted_twice(capsys):
+    timer = PhaseTimer()
+    timer.add('load_weights', 1.0, 0.5, 1)
+    timer.add('candidates', 4.0, 3.0, 0)
+    timer.merge({'selection': [2.5, 2.0, 0], 'fix_schedule': [0.5, 0.5, 0]}, 'candidates')
+    timer.print_summary()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert any(line.startswith('candidates/selection ') for line in lines)
+    assert lines[-1].split() == ['TOTAL', '5.0000', '3.5000', '1']
+    assert timer.summary()['candidates/fix_schedule'] == {'wall': 0.5, 'cpu': 0.5, 'sql': 0}
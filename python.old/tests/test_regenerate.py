@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+from main import SLOTS, Availability, month_dict, regenerate
+from schedule import Schedule
+
+YEAR, MONTH = 2025, 6  # June 1st 2025 is a Sunday, slot u1 on day 1
+MEMBERS = list(range(1000, 1020))
+
+def make_schedule():
+    # Nine different members every day, nobody on the same mass and role two days in a row
+    days = month_dict(YEAR, MONTH)
+    schedule = Schedule(days)
+    for day in days:
+        for mass in range(3):
+            schedule.set_slot(day, mass, [MEMBERS[(day + 3 * mass + k) % len(MEMBERS)] for k in range(3)])
+    return schedule
+
+def make_availability(unavailable=()):
+    # Everybody everywhere, except the (No, slot) pairs in unavailable
+    return Availability([(m, *(0 if (m, slot) in unavailable else 1 for slot in SLOTS)) for m in MEMBERS])
+
+def make_weights():
+    return {role: {m: 100 for m in MEMBERS} for role in ('B', 'R', 'I')}
+
+def test_changed_slot_reassigns_every_role_of_a_mass():
+    schedule = make_schedule()
+    b, r, i = schedule[1][0]
+    availability = make_availability({(b, 'u1'), (r, 'u1')})
+    new, changes = regenerate(schedule, YEAR, MONTH, availability, make_weights(), changed_slots=['u1'], rng=random.Random(0))
+
+    assert [(day, mass, role, old) for day, mass, role, old, _ in changes if day == 1] == [(1, 1, 'B', b), (1, 1, 'R', r)]
+    assert new[1][0][2] == i
+    for day, mass, role, old, member in changes:
+        assert availability.is_available(member, 'u1')
+        assert member not in list(schedule.day_members(day))
+
+def test_changed_members_reassigns_every_role_of_a_mass():
+    schedule = make_schedule()
+    b, r, i = schedule[1][0]
+    weights = make_weights()
+    weights['B'][b] = 0
+    weights['R'][r] = 0
+    new, changes = regenerate(schedule, YEAR, MONTH, make_availability(), weights, changed_members=[b, r], rng=random.Random(0))
+
+    assert changes[:2] == [(1, 1, 'B', b, new[1][0][0]), (1, 1, 'R', r, new[1][0][1])]
+    assert new[1][0][2] == i
+    # Only the roles they lost are taken away, b keeps serving as R/I elsewhere
+    for day, mass, role, old, member in changes:
+        assert (old, role) in ((b, 'B'), (r, 'R'))
+        assert new[day][mass - 1][('B', 'R', 'I').index(role)] == member
+    assert any(b in tuple(slot)[1:] for slots in new.values() for slot in slots)
+
+def test_refund_and_charge():
+    schedule = make_schedule()
+    b = schedule[1][0][0]
+    availability = make_availability({(b, 'u1')})
+    weights = make_weights()
+    new, changes = regenerate(schedule, YEAR, MONTH, availability, weights, changed_members=[b], rng=random.Random(0))
+
+    assert changes == [(1, 1, 'B', b, new[1][0][0])]
+    member = changes[0][4]
+    # b gets their -10 B / -5 R back, the new member pays it
+    assert (weights['B'][b], weights['R'][b], weights['I'][b]) == (110, 105, 100)
+    assert (weights['B'][member], weights['R'][member], weights['I'][member]) == (90, 95, 100)
+    # Nothing else moved
+    assert all(new.cell(day, mass, k) == schedule.cell(day, mass, k)
+               for day in schedule for mass in range(3) for k in range(3) if (day, mass, k) != (1, 0, 0))
+
+def test_zero_weight_stays_zero():
+    schedule = make_schedule()
+    r = schedule[1][0][1]
+    weights = make_weights()
+    weights['R'][r] = 0
+    held = [(day, mass) for day in schedule for mass in range(3) if schedule.cell(day, mass, 1) == r]
+    new, changes = regenerate(schedule, YEAR, MONTH, make_availability(), weights, changed_members=[r], rng=random.Random(0))
+
+    # Every R cell of r is given away, not just the first one
+    assert [(day, mass - 1) for day, mass, role, old, _ in changes] == held
+    assert all(new.cell(day, mass, 1) != r for day in new for mass in range(3))
+    # The R refunds don't bring the 0 back, the B side of the charge is refunded
+    assert weights['R'][r] == 0
+    assert weights['B'][r] == 100 + 5 * len(held)
+
+def test_from_day():
+    schedule = make_schedule()
+    r = schedule[1][0][1]
+    weights = make_weights()
+    weights['R'][r] = 0
+    new, changes = regenerate(schedule, YEAR, MONTH, make_availability(), weights, changed_members=[r], from_day=15, rng=random.Random(0))
+
+    assert changes and all(day >= 15 for day, *_ in changes)
+    assert all(new.cell(day, mass, 1) == schedule.cell(day, mass, 1) for day in range(1, 15) for mass in range(3))
+
+def test_nobody_left():
+    schedule = make_schedule()
+    b = schedule[1][0][0]
+    weights = make_weights()
+    weights['B'] = {m: 0 for m in MEMBERS}
+    with pytest.raises(ValueError, match='Nobody left'):
+        regenerate(schedule, YEAR, MONTH, make_availability(), weights, changed_members=[b])
+
+@pytest.mark.parametrize('extra, error', [
+    ([], 'has no SCHEDULE rows and its CSVs cannot be read'),
+    (['--source', 'sqlite'], 'No SCHEDULE rows for 9/2030'),
+])
+def test_cli_update_errors(tmp_path, monkeypatch, capsys, extra, error):
+    import bench
+    import main
+    monkeypatch.chdir(tmp_path)
+    bench.build_db('ABA.db', 30, 0.5)
+    with pytest.raises(SystemExit) as e:
+        main.main(['9', '2030', '--update', '--changed-members', '1003'] + extra)
+    assert e.value.code == 2
+    assert error in capsys.readouterr().err